@@ -0,0 +1,102 @@
+import json
+import threading
+
+import pygame
+
+
+class AssetManager:
+    """Load the game's images and sounds, as listed in the manifest, and share them between all modules
+
+    Every asset is read from disk only once. Images are loaded up front and converted to the display's format; sounds
+    can be loaded in a background thread while the game starts. Images packed in the atlas (see atlas.py) are all read
+    from that single file, and are drawn as areas of it
+    """
+
+    def __init__(self, manifest_path='manifest.json', convert=True):
+        """Read the manifest. Images are only converted if convert is True, since converting them needs a display"""
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+
+        self.image_entries = manifest['images']
+        self.sound_paths = manifest['sounds']
+        self.atlas_entry = manifest.get('atlas')
+        self.convert = convert
+
+        # The atlas surface, and the rect of each image inside it
+        self.atlas = None
+        self.atlas_rects = dict()
+
+        self.images = dict()
+        self.sounds = dict()
+        # Fonts, by size. They are shared by everything that renders text
+        self.fonts = dict()
+        # Sounds can be requested by the game while the background thread is still loading them
+        self.sounds_lock = threading.Lock()
+
+    def preload_images(self):
+        """Load the atlas and every image of the manifest"""
+        if self.atlas_entry:
+            self._load_atlas()
+
+        for key in self.image_entries:
+            self.image(key)
+
+    def _load_atlas(self):
+        """Load the atlas image and its index"""
+        with open(self.atlas_entry['index']) as index_file:
+            self.atlas_rects = {key: pygame.Rect(rect) for key, rect in json.load(index_file).items()}
+
+        self.atlas = pygame.image.load(self.atlas_entry['image'])
+        if self.convert:
+            self.atlas = self.atlas.convert_alpha()
+
+    def image(self, key):
+        """Return the image stored with the given key, loading it if needed. Images in the atlas are subsurfaces of it,
+        so they share its pixels"""
+        if key not in self.images:
+            if key in self.atlas_rects:
+                image = self.atlas.subsurface(self.atlas_rects[key])
+            else:
+                entry = self.image_entries[key]
+                image = pygame.image.load(entry['path'])
+                if self.convert:
+                    image = image.convert_alpha() if entry['alpha'] else image.convert()
+            self.images[key] = image
+
+        return self.images[key]
+
+    def font(self, size):
+        """Return the game's font at the given size. It's the font bundled with pygame, so finding it doesn't need
+        to scan the fonts installed on the system (like pygame.font.SysFont does)"""
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(None, size)
+
+        return self.fonts[size]
+
+    def region(self, key):
+        """Return the surface to draw the image stored with the given key from, and the area of that surface to draw.
+        The area is None when the image isn't in the atlas"""
+        if key in self.atlas_rects:
+            return self.atlas, self.atlas_rects[key]
+
+        return self.image(key), None
+
+    def load_sounds_in_background(self):
+        """Start loading every sound of the manifest in a background thread"""
+        thread = threading.Thread(target=self._load_sounds, name='sound-loader', daemon=True)
+        thread.start()
+        return thread
+
+    def _load_sounds(self):
+        """Load every sound of the manifest"""
+        for key in self.sound_paths:
+            self.sound(key)
+
+    def sound(self, key):
+        """Return the sound stored with the given key, loading it if the background thread hasn't done it yet. Sounds
+        are converted to the mixer's format once, when loaded, so playing them needs no conversion"""
+        with self.sounds_lock:
+            if key not in self.sounds:
+                self.sounds[key] = pygame.mixer.Sound(self.sound_paths[key])
+
+            return self.sounds[key]
@@ -0,0 +1,71 @@
+"""Build the sprite atlas: a single image with every image of the manifest packed in it, plus an index with the rect of
+each image inside the atlas
+
+Run it from the root of the project after changing any image: python atlas.py
+"""
+import json
+import math
+
+import pygame
+
+# Space between the packed images, so scaling or filtering never bleeds a neighbour into an image
+PADDING = 1
+
+
+def pack_images(images, padding=PADDING):
+    """Pack the images (a dictionary of surfaces) into rows, and return the size of the atlas and the rect of each one
+
+    Images are sorted by height and placed left to right; a new row is started when the current one is full
+    """
+    total_area = sum((image.get_width() + padding) * (image.get_height() + padding) for image in images.values())
+    widest = max(image.get_width() for image in images.values())
+    max_width = max(widest + padding, math.ceil(math.sqrt(total_area)))
+
+    rects = dict()
+    x = y = row_height = 0
+    for key, image in sorted(images.items(), key=lambda item: item[1].get_height(), reverse=True):
+        width, height = image.get_size()
+        if x + width > max_width:
+            # Start a new row
+            x = 0
+            y += row_height + padding
+            row_height = 0
+
+        rects[key] = pygame.Rect(x, y, width, height)
+        x += width + padding
+        row_height = max(row_height, height)
+
+    atlas_width = max(rect.right for rect in rects.values())
+    atlas_height = max(rect.bottom for rect in rects.values())
+    return (atlas_width, atlas_height), rects
+
+
+def build_atlas(images, padding=PADDING):
+    """Pack the images into a single surface, and return it with the rect of each image inside it"""
+    size, rects = pack_images(images, padding)
+    atlas = pygame.Surface(size, pygame.SRCALPHA)
+    for key, rect in rects.items():
+        atlas.blit(images[key], rect)
+
+    return atlas, rects
+
+
+def main(manifest_path='manifest.json'):
+    """Build the atlas for the images of the manifest, and save it where the manifest says"""
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    images = {key: pygame.image.load(entry['path']) for key, entry in manifest['images'].items()}
+    atlas, rects = build_atlas(images)
+
+    pygame.image.save(atlas, manifest['atlas']['image'])
+    # The index is written with one image per line, so changes to it are easy to review
+    lines = [f'  {json.dumps(key)}: {json.dumps(list(rects[key]))}' for key in sorted(rects)]
+    with open(manifest['atlas']['index'], 'w') as index_file:
+        index_file.write('{\n' + ',\n'.join(lines) + '\n}\n')
+
+    print(f"Packed {len(rects)} images into a {atlas.get_width()}x{atlas.get_height()} atlas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark of the collision searches, to find where sweep and prune starts beating brute force
+
+Run it from the root of the project with: python -m benchmarks.bench_collisions
+"""
+import random
+import timeit
+
+import pygame
+
+from collisions import rect_arrays, find_collisions, brute_force_collisions, sweep_and_prune_collisions
+
+SCREEN_WIDTH, SCREEN_HEIGHT = 1300, 800
+BULLET_COUNTS = [1, 3, 10, 30, 100, 300]
+ALIEN_COUNTS = [60, 250, 1000, 4000]
+
+
+def random_rects(count, width, height):
+    """Create rects of the given size at random positions of the screen"""
+    return [pygame.Rect(random.randrange(SCREEN_WIDTH), random.randrange(SCREEN_HEIGHT), width, height)
+            for _ in range(count)]
+
+
+def check_same_hits_as_groupcollide(bullets, aliens):
+    """Make sure both searches report the same hits as pygame's groupcollide"""
+    bullet_sprites = [pygame.sprite.Sprite() for _ in bullets]
+    alien_sprites = [pygame.sprite.Sprite() for _ in aliens]
+    for sprite, rect in zip(bullet_sprites + alien_sprites, bullets + aliens):
+        sprite.rect = rect
+
+    collisions = pygame.sprite.groupcollide(pygame.sprite.Group(bullet_sprites), pygame.sprite.Group(alien_sprites),
+                                            False, False)
+    expected = {(bullet_sprites.index(bullet), alien_sprites.index(alien))
+                for bullet, aliens_hit in collisions.items() for alien in aliens_hit}
+
+    for search in (find_collisions, brute_force_collisions, sweep_and_prune_collisions):
+        found = set(zip(*(indexes.tolist() for indexes in search(rect_arrays(bullets), rect_arrays(aliens)))))
+        assert found == expected, f"{search.__name__} doesn't match groupcollide"
+
+
+def main():
+    random.seed(0)
+    print(f"{'bullets':>8} {'aliens':>8} {'pairs':>9} {'brute (us)':>11} {'sweep (us)':>11}  fastest")
+    for alien_count in ALIEN_COUNTS:
+        aliens = random_rects(alien_count, 90, 64)
+        for bullet_count in BULLET_COUNTS:
+            bullets = random_rects(bullet_count, 3, 15)
+            check_same_hits_as_groupcollide(bullets, aliens)
+
+            bullet_rects, alien_rects = rect_arrays(bullets), rect_arrays(aliens)
+            timings = []
+            for search in (brute_force_collisions, sweep_and_prune_collisions):
+                timer = timeit.Timer(lambda: search(bullet_rects, alien_rects))
+                number, _ = timer.autorange()
+                timings.append(min(timer.repeat(3, number)) / number * 1e6)
+
+            fastest = 'brute' if timings[0] <= timings[1] else 'sweep'
+            print(f"{bullet_count:>8} {alien_count:>8} {bullet_count * alien_count:>9} "
+                  f"{timings[0]:>11.1f} {timings[1]:>11.1f}  {fastest}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark of the memory used by each bullet, and of the cost of updating bullets
+
+For comparison, the same bullets are also measured as they used to be: objects with a __dict__ and a reference to each
+part of the game they use. Aliens have no objects at all, since the fleet keeps them in arrays.
+
+Run it from the root of the project with: python -m benchmarks.bench_entities
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import tracemalloc
+from timeit import timeit
+
+import pygame
+
+from pynvaders import Pynvaders
+import bullets
+
+ENTITIES = 10_000
+
+
+class DictBullet:
+    """A bullet with a __dict__ and a reference to each part of the game it uses, like it used to be"""
+
+    def __init__(self, pool, pynvaders_game):
+        self.pool = pool
+        self.renderer = pynvaders_game.renderer
+        self.screen_rect = pynvaders_game.screen.get_rect()
+        self.settings = pynvaders_game.settings
+        self.index = -1
+        self.color = self.settings.player_bullet_color
+        self.rect = pygame.Rect(0, 0, self.settings.player_bullet_width, self.settings.player_bullet_height)
+        self.y = 0.0
+        self.previous_y = 0.0
+        self.direction = -1
+        self.speed = 0.0
+
+    def update(self):
+        self.previous_y = self.y
+        self.y += self.speed * self.direction
+        self.rect.y = self.y
+
+        if self.direction == -1 and self.rect.bottom <= 0:
+            self.pool.release(self)
+        elif self.direction == 1 and self.rect.top >= self.screen_rect.bottom:
+            self.pool.release(self)
+
+
+def bytes_per_entity(create):
+    """Return the memory allocated, in bytes, by each of many entities made by create()"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    entities = [create(index) for index in range(ENTITIES)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The list holding the entities is not part of them
+    return (after - before) / len(entities) - 8
+
+
+def update_time(bullet):
+    """Return the time, in nanoseconds, of a single update of a bullet that stays on the screen"""
+    def update():
+        bullet.y = bullet.previous_y = 400.0
+        bullet.update()
+
+    runs = 200_000
+    return timeit(update, number=runs) / runs * 1e9
+
+
+def main():
+    game = Pynvaders(headless=True, seed=0)
+    pool = game.player_bullets
+
+    print(f"{'entity':<34} {'bytes':>7}")
+    for name, create in (
+            ('PlayerBullet (slots)', lambda index: bullets.PlayerBullet(pool, game)),
+            ('Bullet with a __dict__ (before)', lambda index: DictBullet(pool, game))):
+        print(f"{name:<34} {bytes_per_entity(create):>7.0f}")
+
+    print(f"\n{'bullet update':<34} {'ns':>7}")
+    for name, bullet in (('PlayerBullet (slots)', bullets.PlayerBullet(pool, game)),
+                         ('Bullet with a __dict__ (before)', DictBullet(pool, game))):
+        bullet.speed = 1.0
+        print(f"{name:<34} {update_time(bullet):>7.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""Benchmark of the frame loop, with per-subsystem timings
+
+Runs scripted scenarios of the real game (rendering included) on SDL's dummy video driver, and reports the p50 and p99
+time of each subsystem per frame, plus the memory allocated per frame. Each scenario is timed several times, after a
+few warm-up frames, and the median of those runs is reported. Results can be saved as a baseline, and later runs
+compared against it.
+
+Run it from the root of the project with: python -m benchmarks.bench_frame [--save FILE] [--compare FILE]
+"""
+import os
+
+# The benchmark never opens a real window, nor plays sounds
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from pynvaders import Pynvaders
+from settings import Settings
+from fleet_state import ORANGE
+import replay
+
+SEED = 1
+# Frames run before measuring (so caches, lazily built tables and surfaces are ready), frames measured by each timing
+# run of a scenario, and frames measured again with allocation tracking
+WARMUP_FRAMES = 60
+FRAMES = 300
+ALLOCATION_FRAMES = 60
+# Timing runs of each scenario. The scenarios take turns, so a burst of load on the machine is spread over all of them,
+# and the median of the runs is reported
+REPETITIONS = 5
+# Simulation ticks run on each frame (like a 60 fps frame at 300 ticks per second)
+TICKS_PER_FRAME = 5
+# A subsystem is reported as a regression when its p50 grows by more than this fraction over the baseline. Runs of the
+# same code on a shared machine differ by up to about 20% (for timings of a few tenths of a millisecond), so the
+# margin is well above that
+REGRESSION_THRESHOLD = 0.5
+
+SUBSYSTEMS = ('fleet', 'bullets', 'collisions', 'render')
+
+
+def full_fleet_level_1(game):
+    """The full fleet of the first level"""
+
+
+def orange_shooters_level_20(game):
+    """Level 20, with half of the fleet made of orange shooters"""
+    game.stats.level = 20
+    game.settings.alien_bullets_allowed = 50
+    game.fleet.create_fleet()
+
+    state = game.fleet.state
+    state.alien_class[::2] = ORANGE
+    state.hp[::2] = 1
+    state.image_index[::2] = 1
+    game.fleet._schedule_abilities()
+
+
+def bullet_saturated(game):
+    """Hundreds of bullets on the screen"""
+    game.settings.player_bullets_allowed = 300
+    game.settings.alien_bullets_allowed = 300
+    game.settings.player_bullet_speed = 0.5
+    game.stats.level = 20
+    game.fleet.create_fleet()
+    game.fleet.state.alien_class[:] = ORANGE
+    game.fleet._schedule_abilities()
+
+
+def oversized_screen(game):
+    """A 4K screen, with a much larger fleet"""
+
+
+SCENARIOS = {
+    'full_fleet_level_1': (full_fleet_level_1, None),
+    'orange_shooters_level_20': (orange_shooters_level_20, None),
+    'bullet_saturated': (bullet_saturated, None),
+    'oversized_screen': (oversized_screen, (3840, 2160)),
+}
+
+
+class SubsystemTimer:
+    """Time the subsystems of the game by wrapping the methods that run them"""
+
+    def __init__(self, game):
+        """Wrap the methods of the game instance"""
+        self.frame_times = {subsystem: 0.0 for subsystem in SUBSYSTEMS}
+
+        self._wrap(game.fleet, 'update_aliens', 'fleet')
+        self._wrap(game.player_bullets, 'update', 'bullets')
+        self._wrap(game.alien_bullets, 'update', 'bullets')
+        self._wrap(game, '_check_bullet_alien_collisions', 'collisions')
+        self._wrap(game, '_check_bullet_ship_collisions', 'collisions')
+        self._wrap(game, '_update_screen', 'render')
+
+    def _wrap(self, owner, method_name, subsystem):
+        """Replace a method of an instance with one that adds its running time to the subsystem"""
+        method = getattr(owner, method_name)
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            result = method(*args, **kwargs)
+            self.frame_times[subsystem] += perf_counter() - start
+            return result
+
+        setattr(owner, method_name, timed)
+
+    def end_frame(self):
+        """Return the time spent on each subsystem during the frame, and start a new one"""
+        frame_times = self.frame_times
+        self.frame_times = {subsystem: 0.0 for subsystem in SUBSYSTEMS}
+        return frame_times
+
+
+def create_game(setup, screen_size):
+    """Create a game running the scenario"""
+    settings = Settings()
+    # The dummy video driver has no GPU renderer to scale the frames with, so they are measured unscaled
+    settings.scaled = False
+    # The scenarios never end a game, but they shouldn't open the player's high scores either
+    settings.high_scores_path = None
+    if screen_size:
+        settings.screen_width, settings.screen_height = screen_size
+    game = Pynvaders(seed=SEED, settings=settings)
+
+    game.handle_input(replay.START)
+    # The benchmark measures throughput, so the ship is never hit (which would also pause the game)
+    game.ship_hit = lambda: None
+    setup(game)
+    return game
+
+
+def run_frame(game):
+    """Run a frame of the game: the player fires and moves, the simulation advances, and the frame is drawn"""
+    for _ in range(TICKS_PER_FRAME):
+        game.handle_input(replay.FIRE)
+        if game.clock.ticks % 600 == 0:
+            game.handle_input(replay.RIGHT_PRESSED)
+            game.handle_input(replay.LEFT_RELEASED)
+        elif game.clock.ticks % 600 == 300:
+            game.handle_input(replay.RIGHT_RELEASED)
+            game.handle_input(replay.LEFT_PRESSED)
+        game.tick()
+
+    game._update_screen(0.5)
+
+
+def time_scenario(name):
+    """Run a scenario once, and return the p50 and p99 time of each subsystem per frame, in milliseconds, and the
+    number of aliens alive at the end"""
+    setup, screen_size = SCENARIOS[name]
+    game = create_game(setup, screen_size)
+    for _ in range(WARMUP_FRAMES):
+        run_frame(game)
+
+    timer = SubsystemTimer(game)
+    samples = {subsystem: [] for subsystem in SUBSYSTEMS + ('total',)}
+    for _ in range(FRAMES):
+        start = perf_counter()
+        run_frame(game)
+        total = perf_counter() - start
+        for subsystem, frame_time in timer.end_frame().items():
+            samples[subsystem].append(frame_time)
+        samples['total'].append(total)
+
+    timings = {subsystem: (np.percentile(times, 50) * 1000, np.percentile(times, 99) * 1000)
+               for subsystem, times in samples.items()}
+    return timings, game.fleet.state.alive_count()
+
+
+def run_scenarios(names):
+    """Run the scenarios, and return the results of each one"""
+    runs = {name: [] for name in names}
+    for _ in range(REPETITIONS):
+        for name in names:
+            runs[name].append(time_scenario(name))
+
+    results = dict()
+    for name in names:
+        results[name] = {
+            subsystem: {
+                'p50_ms': round(float(np.median([timings[subsystem][0] for timings, _ in runs[name]])), 4),
+                'p99_ms': round(float(np.median([timings[subsystem][1] for timings, _ in runs[name]])), 4),
+            }
+            for subsystem in SUBSYSTEMS + ('total',)
+        }
+        results[name]['aliens'] = runs[name][-1][1]
+        results[name]['allocated_kib_per_frame'] = measure_allocations(name)
+
+    return results
+
+
+def measure_allocations(name):
+    """Return the p50 and p99 memory allocated per frame by a scenario, in KiB. Tracking allocations slows everything
+    down, so it's kept apart from the timings"""
+    setup, screen_size = SCENARIOS[name]
+    game = create_game(setup, screen_size)
+    for _ in range(WARMUP_FRAMES):
+        run_frame(game)
+
+    tracemalloc.start()
+    allocated = []
+    for _ in range(ALLOCATION_FRAMES):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        run_frame(game)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - before)
+    tracemalloc.stop()
+    return {
+        'p50': round(float(np.percentile(allocated, 50) / 1024), 1),
+        'p99': round(float(np.percentile(allocated, 99) / 1024), 1),
+    }
+
+
+def print_results(results):
+    """Print the results of every scenario as a table"""
+    print(f"{'scenario':<26} {'subsystem':<11} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for name, scenario_results in results.items():
+        for subsystem in SUBSYSTEMS + ('total',):
+            timings = scenario_results[subsystem]
+            print(f"{name:<26} {subsystem:<11} {timings['p50_ms']:>9.3f} {timings['p99_ms']:>9.3f}")
+        allocated = scenario_results['allocated_kib_per_frame']
+        print(f"{name:<26} {'allocated':<11} {allocated['p50']:>8.1f}K {allocated['p99']:>8.1f}K"
+              f"   ({scenario_results['aliens']} aliens alive at the end)")
+
+
+def compare(results, baseline):
+    """Print how the results changed from the baseline, and return the number of regressions"""
+    regressions = 0
+    print(f"\n{'scenario':<26} {'subsystem':<11} {'baseline':>9} {'now':>9} {'change':>8}")
+    for name, scenario_results in results.items():
+        if name not in baseline['results']:
+            continue
+        for subsystem in SUBSYSTEMS + ('total',):
+            before = baseline['results'][name][subsystem]['p50_ms']
+            now = scenario_results[subsystem]['p50_ms']
+            change = (now - before) / before if before else 0.0
+            flag = ''
+            if change > REGRESSION_THRESHOLD:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{name:<26} {subsystem:<11} {before:>9.3f} {now:>9.3f} {change:>+8.1%}{flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the frame loop of Pynvaders")
+    parser.add_argument('--scenario', choices=SCENARIOS, action='append', help="run only the given scenario(s)")
+    parser.add_argument('--save', metavar='FILE', help="save the results as a JSON baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare the results with a saved baseline")
+    args = parser.parse_args()
+
+    results = run_scenarios(args.scenario or list(SCENARIOS))
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results},
+                      baseline_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file))
+        if regressions:
+            raise SystemExit(f"{regressions} subsystem(s) regressed more than {REGRESSION_THRESHOLD:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark of the high score store with millions of scores, like the ones added by many simulator runs
+
+It measures how long adding a score takes on the caller's side (the time a frame would wait), how long writing the log,
+closing the store, opening it (with and without its index) and the top-N and per-player queries take.
+
+Run it from the root of the project with: python -m benchmarks.bench_high_scores [--records N]
+"""
+import argparse
+import os
+import random
+import tempfile
+from time import perf_counter
+
+from high_scores import HighScoreStore
+
+PLAYERS = 1000
+BATCH = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the high score store")
+    parser.add_argument('--records', type=int, default=1_000_000, help="number of scores to add (1,000,000 by default)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    games = [(f'player-{rng.randrange(PLAYERS)}', rng.randrange(1_000_000), rng.randrange(1, 40))
+             for _ in range(args.records)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'high_scores.log')
+        store = HighScoreStore(path)
+
+        # Single scores, like the game adds them at the end of each game
+        add_times = []
+        for player, score, level in games[:1000]:
+            start = perf_counter()
+            store.add(player, score, level)
+            add_times.append(perf_counter() - start)
+        add_times.sort()
+
+        # The rest in batches, like the simulator adds them
+        start = perf_counter()
+        for index in range(1000, len(games), BATCH):
+            store.add_many(games[index:index + BATCH])
+        add_many_time = perf_counter() - start
+
+        start = perf_counter()
+        store.close()
+        close_time = perf_counter() - start
+        log_size = os.path.getsize(path)
+
+        start = perf_counter()
+        store = HighScoreStore(path)
+        open_time = perf_counter() - start
+
+        start = perf_counter()
+        store.top(10)
+        top_time = perf_counter() - start
+
+        start = perf_counter()
+        store.player_top('player-7', 10)
+        player_top_time = perf_counter() - start
+
+        # Closing after a single game, like the game does, leaves the index as it is
+        store.add('player-7', 1, 1)
+        start = perf_counter()
+        store.close()
+        close_one_time = perf_counter() - start
+
+        os.remove(store.index_path)
+        start = perf_counter()
+        store = HighScoreStore(path)
+        rebuild_time = perf_counter() - start
+        store.close()
+
+    print(f"{len(games):,} scores, {log_size / 1e6:.1f} MB of log")
+    print(f"{'add (p50 / max)':<30} {add_times[len(add_times) // 2] * 1e6:>8.1f} us {add_times[-1] * 1e6:>8.1f} us")
+    print(f"{'add_many (per score)':<30} {add_many_time / (len(games) - 1000) * 1e6:>8.2f} us")
+    print(f"{'close (write log and index)':<30} {close_time * 1000:>8.0f} ms")
+    print(f"{'close after a single score':<30} {close_one_time * 1000:>8.1f} ms")
+    print(f"{'open (with the index)':<30} {open_time * 1000:>8.0f} ms")
+    print(f"{'open (reading the whole log)':<30} {rebuild_time * 1000:>8.0f} ms")
+    print(f"{'top 10':<30} {top_time * 1000:>8.1f} ms")
+    print(f"{'top 10 of a player':<30} {player_top_time * 1000:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
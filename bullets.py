@@ -1,76 +1,176 @@
 import pygame
-from pygame.sprite import Sprite
 
+from entity import Entity
 
-class BaseBullet(Sprite):
-    """A class to manage the bullets from the game"""
-    def __init__(self, pynvaders_game):
-        super().__init__()
-        self.screen = pynvaders_game.screen
-        self.settings = pynvaders_game.settings
-        self.player_bullets = pynvaders_game.player_bullets
-        self.alien_bullets = pynvaders_game.alien_bullets
 
-        self.color = None
-        self.y = 0
+class BaseBullet(Entity):
+    """A class to manage the bullets from the game
 
-        self.direction = 0
-        self.speed = 0
+    Bullets are owned by a BulletPool, which creates them once and recycles them every time they are fired. The
+    color of a bullet is shared by its whole class, and read by its pool from the setting the class names
+    """
+    __slots__ = ('pool', 'index', 'rect', 'y', 'previous_y', 'speed')
 
-    def update(self):
-        """Move the bullet up or down the screen"""
-        # Update the decimal position of the bullet
-        self.y += self.speed * self.direction
-        # Update the rect position
-        self.rect.y = self.y
+    def __init__(self, pool, pynvaders_game):
+        super().__init__(pynvaders_game)
+        self.pool = pool
+
+        # Position of the bullet in the pool's list of active bullets
+        self.index = -1
 
-        if self.direction == -1 and self.rect.bottom <= 0:
-            # When a ship's bullet moves off the top of the screen, remove it from the bullets group
-            self.player_bullets.remove(self)
-        elif self.direction == 1 and self.rect.top >= self.screen.get_rect().bottom:
-            # When an alien's bullet moves off the bottom of the screen, remove it from the bullets group
-            self.alien_bullets.remove(self)
+        self.rect = None
+        self.y = 0
+        # Position on the previous simulation tick, used to draw the bullet between ticks
+        self.previous_y = 0
+
+        self.speed = 0
 
-    def draw_bullet(self):
-        """Draw the bullet to the screen"""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def draw_bullet(self, alpha=1.0):
+        """Draw the bullet to the screen, interpolated between the last two simulation ticks"""
+        y = self.previous_y + (self.y - self.previous_y) * alpha
+        self.game.renderer.fill(self.pool.color, self.rect.move(0, round(y) - self.rect.y))
 
 
 class PlayerBullet(BaseBullet):
     """A class to manage bullets fired from the ship"""
-    def __init__(self, pynvaders_game):
-        super().__init__(pynvaders_game)
-        self.color = self.settings.player_bullet_color
+    __slots__ = ()
+
+    # Setting with the color of the ship's bullets
+    color_setting = 'player_bullet_color'
 
-        # The ship's bullets move up the screen
-        self.direction = -1
-        self.speed = self.settings.player_bullet_speed
+    def __init__(self, pool, pynvaders_game):
+        super().__init__(pool, pynvaders_game)
 
         # Create a bullet rect at (0, 0)
-        self.rect = pygame.Rect(0, 0, self.settings.player_bullet_width, self.settings.player_bullet_height)
+        settings = pynvaders_game.settings
+        self.rect = pygame.Rect(0, 0, settings.player_bullet_width, settings.player_bullet_height)
 
-        # Set the bullet's starting position at the ship's position
-        self.rect.midtop = pynvaders_game.ship.rect.midtop
+    def launch(self, ship_rect_midtop):
+        """Set the bullet's starting position at the ship's position"""
+        # The bullet speed increases with the level, so it's read on every launch
+        self.speed = self.game.settings.player_bullet_speed
+        self.rect.midtop = ship_rect_midtop
 
         # Store the bullet's position as a decimal value
         self.y = float(self.rect.y)
+        self.previous_y = self.y
+
+    def update(self):
+        """Move the bullet up the screen"""
+        # Update the decimal position of the bullet, and then the rect position
+        self.previous_y = y = self.y
+        self.y = y = y - self.speed
+        rect = self.rect
+        rect.y = y
+
+        # When the bullet moves off the top of the screen, it goes back to the pool
+        if rect.bottom <= 0:
+            self.pool.release(self)
 
 
 class AlienBullet(BaseBullet):
     """A class to manage bullets fired from the aliens"""
-    def __init__(self, pynvaders_game, alien_rect_midbottom):
-        super().__init__(pynvaders_game)
-        self.color = self.settings.alien_bullet_color
+    __slots__ = ()
+
+    # Setting with the color of the aliens' bullets
+    color_setting = 'alien_bullet_color'
 
-        # The alien's bullets move down the screen
-        self.direction = 1
-        self.speed = self.settings.alien_bullet_speed
+    def __init__(self, pool, pynvaders_game):
+        super().__init__(pool, pynvaders_game)
 
         # Create a bullet rect at (0, 0)
-        self.rect = pygame.Rect(0, 0, self.settings.alien_bullet_width, self.settings.alien_bullet_height)
+        settings = pynvaders_game.settings
+        self.rect = pygame.Rect(0, 0, settings.alien_bullet_width, settings.alien_bullet_height)
 
-        # Set the bullet's starting position at the alien's position
+    def launch(self, alien_rect_midbottom):
+        """Set the bullet's starting position at the alien's position"""
+        self.speed = self.game.settings.alien_bullet_speed
         self.rect.midtop = alien_rect_midbottom
 
         # Store the bullet's position as a decimal value
         self.y = float(self.rect.y)
+        self.previous_y = self.y
+
+    def update(self):
+        """Move the bullet down the screen"""
+        # Update the decimal position of the bullet, and then the rect position
+        self.previous_y = y = self.y
+        self.y = y = y + self.speed
+        rect = self.rect
+        rect.y = y
+
+        # When the bullet moves off the bottom of the screen, it goes back to the pool
+        if rect.top >= self.pool.screen_bottom:
+            self.pool.release(self)
+
+
+class BulletPool:
+    """A pool of preallocated bullets of a single class
+
+    Firing takes a free bullet from the pool instead of creating one, and bullets go back to the pool when they leave
+    the screen or hit something, so sustained firing doesn't allocate new objects
+    """
+
+    def __init__(self, bullet_class, pynvaders_game, size):
+        """Create the pool, with the given number of bullets ready to be fired"""
+        self.bullet_class = bullet_class
+        self.pynvaders_game = pynvaders_game
+        # Bullets in flight leave the screen once they are past its bottom
+        self.screen_bottom = pynvaders_game.screen.get_rect().bottom
+        # Every bullet of the pool is drawn with the same color
+        self.color = getattr(pynvaders_game.settings, bullet_class.color_setting)
+
+        self.free = [bullet_class(self, pynvaders_game) for _ in range(size)]
+        self.active = []
+
+        # Number of bullets taken from the pool (hits) and created because the pool was empty (misses)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Number of bullets in flight"""
+        return len(self.active)
+
+    def __iter__(self):
+        """Iterate over the bullets in flight"""
+        return iter(self.active)
+
+    def sprites(self):
+        """Return a list of the bullets in flight"""
+        return list(self.active)
+
+    def fire(self, position):
+        """Launch a bullet from the given position, and return it"""
+        if self.free:
+            bullet = self.free.pop()
+            self.hits += 1
+        else:
+            bullet = self.bullet_class(self, self.pynvaders_game)
+            self.misses += 1
+
+        bullet.launch(position)
+        bullet.index = len(self.active)
+        self.active.append(bullet)
+        return bullet
+
+    def release(self, bullet):
+        """Return a bullet in flight to the pool"""
+        # The last active bullet takes the place of the released one, so removing a bullet doesn't shift the list
+        last_bullet = self.active.pop()
+        if last_bullet is not bullet:
+            self.active[bullet.index] = last_bullet
+            last_bullet.index = bullet.index
+
+        bullet.index = -1
+        self.free.append(bullet)
+
+    def update(self):
+        """Move all bullets in flight"""
+        # We go backwards, so a bullet released during the update only moves an already updated bullet into its place
+        for index in range(len(self.active) - 1, -1, -1):
+            self.active[index].update()
+
+    def empty(self):
+        """Return all bullets in flight to the pool"""
+        while self.active:
+            self.release(self.active[-1])
@@ -5,13 +5,14 @@ class Button:
     def __init__(self, pynvaders_game, msg):
         """Initialize button attributes"""
         self.screen = pynvaders_game.screen
+        self.renderer = pynvaders_game.renderer
         self.screen_rect = self.screen.get_rect()
 
         # Set the dimensions and properties of the button
         self.width, self.height = 200, 50
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = pynvaders_game.assets.font(48)
 
         # Build the button's rect object and center it
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -28,5 +29,5 @@ class Button:
 
     def draw_button(self):
         # Draw blank button and the draw message
-        self.screen.fill(self.button_color, self.rect)
-        self.screen.blit(self.msg_image, self.msg_image_rect)
+        self.renderer.draw_static('button', self.button_color, self.rect)
+        self.renderer.draw_static('button_msg', self.msg_image, self.msg_image_rect)
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Testing every rect against every other rect is faster than sorting them first when there are few pairs to test, or
+# when one of the sets is very small (like the player's bullets). The crossover points were measured with
+# benchmarks/bench_collisions.py
+BRUTE_FORCE_MAX_PAIRS = 6000
+BRUTE_FORCE_MAX_SMALL_SET = 20
+
+
+def rect_arrays(rects):
+    """Turn a sequence of pygame rects into a tuple of left, top, right and bottom arrays"""
+    values = np.array(rects, dtype=float).reshape(-1, 4)
+    left, top = values[:, 0], values[:, 1]
+    return left, top, left + values[:, 2], top + values[:, 3]
+
+
+def find_collisions(rects_a, rects_b):
+    """Find every pair of colliding rects between two sets of rects, given as left, top, right and bottom arrays
+
+    Returns two arrays, with the indexes in rects_a and rects_b of each colliding pair, ordered by the index in rects_a.
+    Like pygame's colliderect, rects that only touch at their edges don't collide
+    """
+    count_a, count_b = len(rects_a[0]), len(rects_b[0])
+    if count_a * count_b <= BRUTE_FORCE_MAX_PAIRS or min(count_a, count_b) <= BRUTE_FORCE_MAX_SMALL_SET:
+        return brute_force_collisions(rects_a, rects_b)
+
+    return sweep_and_prune_collisions(rects_a, rects_b)
+
+
+def brute_force_collisions(rects_a, rects_b):
+    """Find the colliding pairs by testing every rect of a against every rect of b in a single vectorized step"""
+    left_a, top_a, right_a, bottom_a = (values[:, None] for values in rects_a)
+    left_b, top_b, right_b, bottom_b = rects_b
+    colliding = (left_b < right_a) & (right_b > left_a) & (top_b < bottom_a) & (bottom_b > top_a)
+
+    return np.nonzero(colliding)
+
+
+def sweep_and_prune_collisions(rects_a, rects_b):
+    """Find the colliding pairs by sorting the smaller set of rects on their left edge
+
+    For each rect of the other set, only the sorted rects whose left edge falls inside its horizontal reach are tested,
+    so the cost grows with the number of actual neighbours instead of with the size of both sets
+    """
+    if len(rects_b[0]) > len(rects_a[0]):
+        candidates_b, candidates_a = _sweep_and_prune(rects_b, rects_a)
+    else:
+        candidates_a, candidates_b = _sweep_and_prune(rects_a, rects_b)
+
+    # Keep the same order as the brute force search
+    order = np.lexsort((candidates_b, candidates_a))
+    return candidates_a[order], candidates_b[order]
+
+
+def _sweep_and_prune(rects_a, rects_b):
+    """Find the colliding pairs by sorting the rects of b on their left edge, and sweeping the rects of a over them"""
+    left_a, top_a, right_a, bottom_a = rects_a
+    left_b, top_b, right_b, bottom_b = rects_b
+    if not len(left_a) or not len(left_b):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+    order = np.argsort(left_b, kind='stable')
+    sorted_left_b = left_b[order]
+    max_width_b = (right_b - left_b).max()
+
+    # A rect of b can only collide with a rect of a if its left edge is in (left_a - max_width_b, right_a)
+    start = np.searchsorted(sorted_left_b, left_a - max_width_b, side='right')
+    end = np.searchsorted(sorted_left_b, right_a, side='left')
+    counts = np.maximum(end - start, 0)
+
+    # Expand the ranges of candidates into pairs of indexes
+    candidates_a = np.repeat(np.arange(len(left_a)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    candidates_b = order[np.repeat(start, counts) + offsets]
+
+    # Narrow phase: exact test of each candidate pair
+    colliding = ((left_b[candidates_b] < right_a[candidates_a]) & (right_b[candidates_b] > left_a[candidates_a])
+                 & (top_b[candidates_b] < bottom_a[candidates_a]) & (bottom_b[candidates_b] > top_a[candidates_a]))
+    return candidates_a[colliding], candidates_b[colliding]
+
+
+def collides_any(rect, rects):
+    """Returns True if the pygame rect collides with any of the rects, given as left, top, right and bottom arrays"""
+    left, top, right, bottom = rects
+    return bool(((left < rect.right) & (right > rect.left) & (top < rect.bottom) & (bottom > rect.top)).any())
@@ -0,0 +1,110 @@
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+import replay
+
+# Event types the game responds to. Every other event is dropped before it reaches the queue
+ALLOWED_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.VIDEOEXPOSE)
+# Keys held to move the ship, with the inputs sent when they are pressed and released
+MOVEMENT_KEYS = {
+    pygame.K_RIGHT: (replay.RIGHT_PRESSED, replay.RIGHT_RELEASED),
+    pygame.K_LEFT: (replay.LEFT_PRESSED, replay.LEFT_RELEASED),
+}
+
+
+class InputHandler:
+    """Read the player's inputs, and measure how long they take to show up on the screen
+
+    The event queue only keeps the events the game responds to. Movement keys can be read from the key state on every
+    simulation tick, instead of from the key events. The key state is only updated when the events are read, once per
+    frame, so every tick of a frame sees the same state, and a key pressed and released within one frame is missed.
+
+    Every input that has an effect on the game (presses and releases alike, whether they come from the events or from
+    the key state) is measured once, until the first frame that shows its effect (the first frame presented after a
+    simulation tick ran with it). SDL events carry no usable timestamp, so the latency is given as two bounds: from
+    when the input was read (a lower bound), and from the previous poll of the events (an upper bound, since the input
+    arrived at some point after it). The time an input waits in the queue while the clock sleeps to cap the frame rate
+    is only part of the upper bound
+    """
+
+    def __init__(self, pynvaders_game):
+        """Initialize the input handler, and filter the event queue"""
+        self.pynvaders_game = pynvaders_game
+        self.sample_keys = pynvaders_game.settings.sample_keys
+
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(ALLOWED_EVENTS)
+
+        # Movement keys held down on the last sample
+        self.held_keys = dict.fromkeys(MOVEMENT_KEYS, False)
+
+        # Times of the last two polls of the events. Inputs read on the last poll arrived after the one before it
+        self.previous_poll = self.last_poll = perf_counter()
+
+        # Timestamps (earliest arrival and read time) of the inputs not simulated yet, and of the ones simulated but
+        # not on the screen yet
+        self.waiting_inputs = []
+        self.simulated_inputs = []
+        # Lower and upper bounds of the latency, in seconds, of the last inputs
+        self.latencies = deque(maxlen=pynvaders_game.settings.latency_samples)
+        self.queued_latencies = deque(maxlen=pynvaders_game.settings.latency_samples)
+
+    def poll(self):
+        """Register that the events are about to be read"""
+        self.previous_poll = self.last_poll
+        self.last_poll = perf_counter()
+
+    def send(self, action):
+        """Send an input of the player to the game, and timestamp it if it had an effect"""
+        read_at = perf_counter()
+        if self.pynvaders_game.handle_input(action):
+            self.waiting_inputs.append((self.previous_poll, read_at))
+
+    def sample_movement_keys(self):
+        """Send the presses and releases of the movement keys since the last sample, from the current key state"""
+        pressed = pygame.key.get_pressed()
+        for key, (pressed_input, released_input) in MOVEMENT_KEYS.items():
+            if pressed[key] != self.held_keys[key]:
+                self.held_keys[key] = pressed[key]
+                self.send(pressed_input if pressed[key] else released_input)
+
+    def frame_simulated(self):
+        """Register that simulation ticks ran, so every input read so far has taken effect"""
+        self.simulated_inputs.extend(self.waiting_inputs)
+        self.waiting_inputs.clear()
+
+    def frame_presented(self):
+        """Register that a frame was sent to the display, with the effect of the simulated inputs"""
+        if not self.simulated_inputs:
+            return
+
+        now = perf_counter()
+        for earliest, read_at in self.simulated_inputs:
+            self.latencies.append(now - read_at)
+            self.queued_latencies.append(now - earliest)
+        self.simulated_inputs.clear()
+
+    def latency_report(self):
+        """Return the number of inputs measured, and the mean, median, 99th percentile and maximum of both bounds of
+        their latency ('read' from reading them, 'queued' from the previous poll), in milliseconds"""
+        return {
+            'inputs': len(self.latencies),
+            'read': latency_statistics(self.latencies),
+            'queued': latency_statistics(self.queued_latencies),
+        }
+
+
+def latency_statistics(latencies):
+    """Return the mean, median, 99th percentile and maximum of latencies in seconds, in milliseconds"""
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'mean': 0.0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    return {
+        'mean': sum(latencies) / len(latencies) * 1000,
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'max': latencies[-1] * 1000,
+    }
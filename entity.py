@@ -0,0 +1,11 @@
+class Entity:
+    """Base class for the game objects (the bullets and the ship)
+
+    Entities use __slots__, so they don't carry a per-instance __dict__, and they reach the rest of the game (settings,
+    renderer, pools, etc.) through a single reference to the game instead of keeping a reference to each part of it
+    """
+    __slots__ = ('game',)
+
+    def __init__(self, pynvaders_game):
+        """Initialize the entity with the game it belongs to"""
+        self.game = pynvaders_game
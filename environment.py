@@ -0,0 +1,154 @@
+"""Environments to drive the game from code (agents, load generators, etc.), without a display
+
+PynvadersEnv runs a single headless game: reset() starts a new one, step() applies an action for a few simulation
+ticks, and observation() describes the game as NumPy arrays taken straight from the game state. VectorPynvadersEnv
+steps many independent games at once, and stacks their observations.
+
+    env = VectorPynvadersEnv(8, seed=0)
+    observations = env.reset()
+    observations, rewards, dones, infos = env.step(np.full(8, FIRE))
+"""
+import numpy as np
+
+from pynvaders import Pynvaders
+import replay
+
+# Actions: moving left, right or not at all, with or without firing
+NOOP, LEFT, RIGHT, FIRE, LEFT_FIRE, RIGHT_FIRE = range(6)
+ACTIONS = (NOOP, LEFT, RIGHT, FIRE, LEFT_FIRE, RIGHT_FIRE)
+
+# Columns of the observation arrays
+ALIEN_COLUMNS = ('alive', 'x', 'y', 'alien_class', 'hp', 'kamikaze')
+BULLET_COLUMNS = ('active', 'x', 'y')
+STATS_COLUMNS = ('ship_x', 'ship_y', 'ships_left', 'level', 'score')
+
+
+class PynvadersEnv:
+    """A single headless game, driven one step at a time"""
+
+    def __init__(self, ticks_per_step=5, max_ticks=None):
+        """Initialize the environment. Each step runs the given number of simulation ticks, and an episode is cut short
+        after max_ticks, if given"""
+        self.ticks_per_step = ticks_per_step
+        self.max_ticks = max_ticks
+        self.game = None
+
+    def reset(self, seed=None):
+        """Start a new game with the given seed (a random one by default), and return its first observation"""
+        self.game = Pynvaders(headless=True, seed=seed)
+        self.game.handle_input(replay.START)
+        return self.observation()
+
+    def step(self, action):
+        """Apply an action for the next ticks, and return the observation, the reward (the points scored), whether the
+        episode is over, and a dictionary with more information"""
+        game = self.game
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action: {action}")
+
+        moving_left = action in (LEFT, LEFT_FIRE)
+        moving_right = action in (RIGHT, RIGHT_FIRE)
+        game.handle_input(replay.LEFT_PRESSED if moving_left else replay.LEFT_RELEASED)
+        game.handle_input(replay.RIGHT_PRESSED if moving_right else replay.RIGHT_RELEASED)
+        if action in (FIRE, LEFT_FIRE, RIGHT_FIRE):
+            game.handle_input(replay.FIRE)
+
+        score = game.stats.score
+        for _ in range(self.ticks_per_step):
+            game.tick()
+            if not game.stats.game_active:
+                break
+
+        truncated = self.max_ticks is not None and game.clock.ticks >= self.max_ticks
+        done = not game.stats.game_active or truncated
+        info = {'seed': game.seed, 'ticks': game.clock.ticks, 'level': game.stats.level, 'truncated': truncated}
+        return self.observation(), game.stats.score - score, done, info
+
+    def observation(self):
+        """Describe the game as a dictionary of NumPy arrays (see the *_COLUMNS constants for their columns)
+
+        The arrays have a fixed size: one row per slot of the fleet, and one row per bullet allowed. Rows of dead aliens
+        and of bullets not in flight are zeroed
+        """
+        game = self.game
+        state = game.fleet.state
+
+        aliens = np.zeros((len(state), len(ALIEN_COLUMNS)), dtype=np.float32)
+        aliens[:, 0] = state.alive
+        aliens[:, 1] = state.left
+        aliens[:, 2] = state.top
+        aliens[:, 3] = state.alien_class
+        aliens[:, 4] = state.hp
+        aliens[:, 5] = state.kamikaze
+        aliens[~state.alive] = 0
+
+        return {
+            'aliens': aliens,
+            'player_bullets': self._bullet_array(game.player_bullets, game.settings.player_bullets_allowed),
+            'alien_bullets': self._bullet_array(game.alien_bullets, game.settings.alien_bullets_allowed),
+            'stats': np.array([game.ship.rect.x, game.ship.rect.y, game.stats.ships_left, game.stats.level,
+                               game.stats.score], dtype=np.float32),
+        }
+
+    def _bullet_array(self, bullets, size):
+        """Return the positions of the bullets in flight of a pool, as a fixed size array"""
+        array = np.zeros((size, len(BULLET_COLUMNS)), dtype=np.float32)
+        for row, bullet in enumerate(bullets.active[:size]):
+            array[row] = (1, bullet.rect.x, bullet.rect.y)
+        return array
+
+
+class VectorPynvadersEnv:
+    """Many independent headless games, stepped together in a single process
+
+    Observations are the ones of PynvadersEnv, stacked along a first axis of size K. A game that ends is reset on its
+    own with the next seed, and the step returns the first observation of the new game
+    """
+
+    def __init__(self, k, seed=None, ticks_per_step=5, max_ticks=None):
+        """Create K environments. Games are seeded from the given seed onwards (random seeds by default)"""
+        self.envs = [PynvadersEnv(ticks_per_step, max_ticks) for _ in range(k)]
+        self.next_seed = seed
+
+    def __len__(self):
+        """Number of games"""
+        return len(self.envs)
+
+    def reset(self, seed=None):
+        """Start a new game in every environment, and return their stacked observations"""
+        if seed is not None:
+            self.next_seed = seed
+        return self._stack([env.reset(self._take_seed()) for env in self.envs])
+
+    def step(self, actions):
+        """Apply an action to each game, and return the stacked observations, and arrays with the rewards and whether
+        each episode ended, plus a list with the information of each step"""
+        if len(actions) != len(self.envs):
+            raise ValueError(f"Expected {len(self.envs)} actions, got {len(actions)}")
+
+        observations = []
+        rewards = np.zeros(len(self.envs), dtype=np.float32)
+        dones = np.zeros(len(self.envs), dtype=bool)
+        infos = []
+        for number, (env, action) in enumerate(zip(self.envs, actions)):
+            observation, rewards[number], dones[number], info = env.step(int(action))
+            if dones[number]:
+                # The final observation is kept in the information, and the game starts again
+                info['final_observation'] = observation
+                observation = env.reset(self._take_seed())
+            observations.append(observation)
+            infos.append(info)
+
+        return self._stack(observations), rewards, dones, infos
+
+    def _take_seed(self):
+        """Return the seed for the next game"""
+        if self.next_seed is None:
+            return None
+        seed = self.next_seed
+        self.next_seed += 1
+        return seed
+
+    def _stack(self, observations):
+        """Stack the observations of every game, array by array"""
+        return {key: np.stack([observation[key] for observation in observations]) for key in observations[0]}
@@ -1,7 +1,10 @@
-import pygame
-import os
-import random
-from alien import Alien
+import heapq
+
+import numpy as np
+
+from collisions import rect_arrays, find_collisions, collides_any
+from fleet_state import FleetState, ALIEN_CLASSES, BLUE, ORANGE
+from spawn_table import SpawnTable
 
 
 class Fleet:
@@ -9,16 +12,22 @@ class Fleet:
         """Initialize the fleet"""
         self.pynvaders_game = pynvaders_game
         self.screen = pynvaders_game.screen
+        self.renderer = pynvaders_game.renderer
         self.settings = pynvaders_game.settings
         self.stats = pynvaders_game.stats
         self.ship = pynvaders_game.ship
         self.sounds = pynvaders_game.sounds
-        # Holds the rows of the fleet
-        self.fleet_rows = dict()
-        # Contains the direction of the rows of the fleet: 1 represents right; -1 represents left
-        self.row_direction = dict()
-        # Holds the 3 types of images for the different classes of aliens
+        self.clock = pynvaders_game.clock
+        self.rng = pynvaders_game.rng
+        # Holds the state of every alien of the fleet
+        self.state = FleetState()
+        # Heap of (time of the last attempt, index) for each alien with an ability, so only the aliens whose ability is
+        # ready are woken up
+        self.ability_queue = []
+        # Holds the 3 types of images for the different classes of aliens, and the (surface, area) of each one in the
+        # sprite atlas, used to draw them
         self.alien_images = dict()
+        self.alien_regions = dict()
         self._load_alien_images()
 
         # Holds the base HP of each alien class
@@ -27,9 +36,11 @@ class Fleet:
             'blue': [3, 5, 7],
             'orange': [1, 2, 3],
         }
+        # Compiled chances of each alien class and HP, by level
+        self.spawn_tables = dict()
 
     def _load_alien_images(self):
-        """Load the alien images, and store them in a dictionary"""
+        """Get the alien images from the asset manager, and store them in a dictionary"""
         """
         The dictionary will be structured as follows:
             alien_images = {
@@ -46,24 +57,19 @@ class Fleet:
                 'orange': {
                     etc...
         """
-        for path, subdir, filenames in os.walk('images/aliens/'):
-            for name in filenames:
-                if name.endswith('.png'):
-                    filename = name[:-4]
-                    directory_name = os.path.basename(path)
-
-                    if directory_name not in self.alien_images:
-                        self.alien_images.update({directory_name: dict()})
-
-                    img = pygame.image.load(os.path.join(path, name)).convert_alpha()
-                    self.alien_images[directory_name].update({int(filename): img})
+        assets = self.pynvaders_game.assets
+        for alien_class in ALIEN_CLASSES:
+            self.alien_images[alien_class] = {
+                image_index: assets.image(f'aliens/{alien_class}/{image_index}') for image_index in range(1, 4)
+            }
+            self.alien_regions[alien_class] = {
+                image_index: assets.region(f'aliens/{alien_class}/{image_index}') for image_index in range(1, 4)
+            }
 
     def create_fleet(self):
         """Create the fleet of aliens"""
-        # Create an alien and find the number of aliens in a row
-        # Spacing between each alien is equal to one alien width
-        alien = Alien(self.pynvaders_game, 'green', 1, self.alien_images['green'][1], 0, 0)
-        alien_width, alien_height = alien.rect.size
+        # Find the number of aliens in a row. Spacing between each alien is equal to one alien width
+        alien_width, alien_height = self.alien_images['green'][1].get_size()
         available_space_x = self.settings.screen_width - (2 * alien_width)
         number_aliens_x = available_space_x // (2 * alien_width)
 
@@ -72,132 +78,244 @@ class Fleet:
         available_space_y = (self.settings.screen_height - (3 * alien_height) - ship_height)
         number_rows = available_space_y // (2 * alien_height)
 
-        # Create the full fleet of aliens
-        self.fleet_rows = dict()
-
-        for row_number in range(number_rows):
-            self.row_direction[row_number] = 1
-            self.fleet_rows[row_number] = pygame.sprite.Group()
-            for alien_number in range(number_aliens_x):
-                alien_data = self._get_alien_class_and_hp()
-                image_index = self.alien_classes_hp[alien_data[0]].index(alien_data[1]) + 1
-
-                self._create_alien(alien_data[0], alien_data[1], image_index, row_number, alien_number)
-
-    def _create_alien(self, alien_class, hp, image_index, row_number, alien_number):
-        """Create an alien and place it in the row"""
-        alien = Alien(self.pynvaders_game, alien_class, hp, self.alien_images[alien_class][image_index]
-                      , row_number, alien_number)
-        alien_width, alien_height = alien.rect.size
-        alien.x = alien_width + 2 * alien_width * alien_number
-        alien.rect.x = alien.x
-        alien.y = alien.rect.height + 2 * alien.rect.height * row_number
-        alien.rect.y = alien.y
-        self.fleet_rows[row_number].add(alien)
-
-    def _get_alien_class_and_hp(self):
-        """Get a random alien class and HP"""
-        # For the first 2 levels, only the green aliens will be present
-        if self.stats.level in range(1, 3):
-            possible_classes = ['green']
-            possible_classes_prob = [1]
-        elif self.stats.level in range(3, 6):
-            # For levels 3-5, there will be a 15% chance of the blue aliens being present
-            possible_classes = ['green', 'blue']
-            possible_classes_prob = [0.85, 0.15]
-        else:
-            # From level 6 and forward, we will calculate the probability of each alien class being chosen, increasing
-            # as the player progresses through the levels
-            possible_classes = ['green', 'blue', 'orange']
-            green_prob = (self.stats.level - 5) * 0.01
-            blue_prob = (self.stats.level - 5) * 0.001
-            orange_prob = (self.stats.level - 5) * 0.0009
-            possible_classes_prob = [green_prob, blue_prob, orange_prob]
-
-        alien_class_list = random.choices(possible_classes, weights=possible_classes_prob)
-        alien_class = alien_class_list[0]
-
-        # From the fourth level and forward, there will be a small probability for the chosen alien class to have more
-        # HP. Each alien class have 3 possible HP values, and the probability of each one is 85%, 10% and 5%
-        if self.stats.level > 4:
-            alien_hp = random.choices(self.alien_classes_hp[alien_class], weights=[0.85, 0.10, 0.05])
+        # Create the full fleet of aliens. Every alien is a slot in the fleet state, laid out row by row
+        self.state = state = FleetState(number_rows * number_aliens_x, number_rows, alien_width, alien_height)
+        rows, alien_numbers = np.divmod(np.arange(len(state)), number_aliens_x)
+        state.x[:] = alien_width + 2 * alien_width * alien_numbers
+        state.y[:] = alien_height + 2 * alien_height * rows
+        state.previous_x[:] = state.x
+        state.previous_y[:] = state.y
+        state.row[:] = rows
+        state.alive[:] = True
+        state.cooldown[:] = self.clock.time
+        state.row_count[:] = number_aliens_x
+        state.update_rects()
+        state.update_row_extents()
+
+        state.alien_class[:], state.hp[:], state.image_index[:] = self._get_spawn_table().draw(self.rng, len(state))
+
+        self._schedule_abilities()
+
+    def _schedule_abilities(self):
+        """Queue the aliens that have an ability: every orange alien, and the blue aliens in the back 3 rows"""
+        state = self.state
+        has_ability = (state.alien_class == ORANGE) | ((state.alien_class == BLUE) & (state.row <= 2))
+        indexes = np.nonzero(has_ability)[0]
+        self.ability_queue = list(zip(state.cooldown[indexes].tolist(), indexes.tolist()))
+        heapq.heapify(self.ability_queue)
+
+    def _get_spawn_table(self):
+        """Return the spawn table of the current level, compiling it the first time"""
+        level = self.stats.level
+        if level not in self.spawn_tables:
+            self.spawn_tables[level] = SpawnTable(level, self.alien_classes_hp)
+        return self.spawn_tables[level]
+
+    def check_bullet_collisions(self, bullets):
+        """Check the bullets against the fleet. Bullets that hit any alien are removed, and the hits are processed"""
+        bullet_list = bullets.sprites()
+        if not bullet_list:
+            return
+
+        alien_indexes, alien_rects = self.state.alive_rects()
+        bullets_hit, aliens_hit = find_collisions(rect_arrays([bullet.rect for bullet in bullet_list]), alien_rects)
+        if not len(bullets_hit):
+            return
+
+        # Like pygame's groupcollide, each bullet hits every alien it collides with, and then goes back to its pool
+        for bullet_index in np.unique(bullets_hit):
+            bullets.release(bullet_list[bullet_index])
+
+        self.process_bullet_alien_collisions(alien_indexes[aliens_hit])
+
+    def process_bullet_alien_collisions(self, aliens_hit):
+        """Process bullet-alien collisions, given the indexes of the aliens that were hit by each bullet"""
+        state = self.state
+        for index in aliens_hit:
+            # An alien hit by two bullets at once could already be dead
+            if not state.alive[index]:
+                continue
+
+            # We decrement the alien's hit points
+            state.hp[index] -= 1
+            # We check the alien's health to see if it's dead
+            if state.hp[index] <= 0:
+                self._kill_alien(index)
+                self.stats.score += self.settings.alien_points
+                # We play an explosion sound
+                self.sounds.play_explosion_sound()
+            else:
+                # We check if the alien has a different image for the current HP that it has. If it does, we change
+                # the alien's image to the one that corresponds to the current HP
+                class_hp = self.alien_classes_hp[ALIEN_CLASSES[state.alien_class[index]]]
+                if state.hp[index] in class_hp:
+                    state.image_index[index] = class_hp.index(state.hp[index]) + 1
+                # We play the hit sound, since the alien is still alive
+                self.sounds.play_hit_sound()
+
+    def _kill_alien(self, index):
+        """Remove an alien from the fleet"""
+        state = self.state
+        state.alive[index] = False
+        state.row_count[state.row[index]] -= 1
+        if state.kamikaze[index]:
+            state.kamikaze_indexes.remove(index)
         else:
-            alien_hp = self.alien_classes_hp[alien_class]
-
-        return alien_class, alien_hp[0]
-
-    def process_bullet_alien_collisions(self, collisions, aliens, row):
-        """Process bullet-alien collisions"""
-        # We check the collisions dictionary to decrement the alien's HP that was hit by a bullet
-        for aliens_hit in collisions.values():
-            for alien in aliens_hit:
-                # We decrement the alien's hit points
-                alien.hp -= 1
-                # We check the alien's health to see if it's dead
-                if alien.hp <= 0:
-                    aliens.remove(alien)
-                    self.stats.score += self.settings.alien_points
-                    # We play an explosion sound
-                    self.sounds.play_explosion_sound()
-                else:
-                    # We check if the alien has a different image for the current HP that it has. If it does, we change
-                    # the alien's image to the one that corresponds to the current HP
-                    if alien.hp in self.alien_classes_hp[alien.alien_class]:
-                        image_index = self.alien_classes_hp[alien.alien_class].index(alien.hp)
-                        alien.image = self.alien_images[alien.alien_class][image_index + 1]
-                    # We play the hit sound, since the alien is still alive
-                    self.sounds.play_hit_sound()
-
-        if len(aliens) == 0:
-            self.fleet_rows.pop(row)
+            # The alien could have been at the edge of its row
+            state.update_row_extents(state.row[index])
+
+    def is_destroyed(self):
+        """Returns True if every alien of the fleet is dead"""
+        return self.state.alive_count() == 0
 
     def update_aliens(self):
-        """Check if any of the rows of the fleet is at an edge, then update the position of all aliens in the row"""
+        """Check if any of the rows of the fleet is at an edge, then update the position of all aliens"""
+        state = self.state
+        state.previous_x[:] = state.x
+        state.previous_y[:] = state.y
+
         self._check_row_edges()
 
-        # Look for alien-ship collisions
-        for row, aliens in self.fleet_rows.items():
-            for alien in aliens:
-                alien.update(self.row_direction[row])
+        # Aliens move right or left with their row, unless they are in kamikaze mode. In that case, they move down
+        marching = state.alive & ~state.kamikaze
+        state.x[marching] += self.settings.alien_speed * state.row_direction[state.row[marching]]
+        if state.kamikaze_indexes:
+            state.y[state.kamikaze_indexes] += self.settings.alien_speed
+        state.update_rects()
+
+        # The extents of each row move along with it
+        row_step = self.settings.alien_speed * state.row_direction
+        state.row_min_x += row_step
+        state.row_max_x += row_step
 
-                if alien.rect.colliderect(self.ship.rect):
-                    self.pynvaders_game.ship_hit()
+        # After two seconds in the level, the aliens will start doing their special actions
+        if self.clock.time - self.stats.start_time >= 2:
+            self._use_abilities()
 
-                    return
+        # Look for alien-ship collisions
+        if collides_any(self.ship.rect, state.alive_rects()[1]):
+            self.pynvaders_game.ship_hit()
+
+            return
 
         # Look for aliens hitting the bottom of the screen
         self._check_bottom_screen()
 
+    def draw_aliens(self, alpha=1.0):
+        """Draw every alien of the fleet, interpolated between the last two simulation ticks, in a single batch"""
+        state = self.state
+        indexes = np.nonzero(state.alive)[0]
+        x, y = state.interpolated_positions(alpha)
+
+        draws = []
+        for alien_class, image_index, alien_x, alien_y in zip(state.alien_class[indexes].tolist(),
+                                                              state.image_index[indexes].tolist(),
+                                                              x[indexes].tolist(), y[indexes].tolist()):
+            texture, area = self.alien_regions[ALIEN_CLASSES[alien_class]][image_index]
+            draws.append((texture, (alien_x, alien_y), area))
+
+        self.renderer.blits(draws)
+
+    def _use_abilities(self):
+        """Let the aliens whose ability is ready use it: orange aliens shoot bullets, and blue aliens in the back 3 rows
+        activate their kamikaze attack
+
+        Only the aliens at the front of the ability queue are looked at, so the cost depends on how many abilities are
+        ready, not on the size of the fleet
+        """
+        queue = self.ability_queue
+        now = self.clock.time
+        # A single alien will only have a chance of using its ability every 2 seconds
+        ready = []
+        while queue and now - queue[0][0] >= 2:
+            ready.append(heapq.heappop(queue)[1])
+        if not ready:
+            return
+
+        state = self.state
+        # Orange aliens act before blue ones, each in the order of the fleet
+        ready.sort(key=lambda index: (state.alien_class[index] != ORANGE, index))
+        for index in ready:
+            # Dead aliens simply leave the queue
+            if not state.alive[index]:
+                continue
+
+            if state.alien_class[index] == ORANGE:
+                self._shoot_bullet(index)
+            else:
+                self._activate_kamikaze(index)
+                # An alien in kamikaze mode has no more use for its ability
+                if state.kamikaze[index]:
+                    continue
+
+            # The alien goes back to the queue. An orange alien that couldn't shoot keeps its place, and tries again on
+            # the next tick
+            heapq.heappush(queue, (float(state.cooldown[index]), index))
+
+    def _shoot_bullet(self, index):
+        """Shoot a bullet from an orange alien"""
+        if len(self.pynvaders_game.alien_bullets) < self.settings.alien_bullets_allowed:
+            # The chance of the alien shooting a bullet is 80%
+            if self.rng.choice(range(1, 100)) <= 80:
+                left = int(self.state.left[index])
+                top = int(self.state.top[index])
+                midbottom = (left + self.state.alien_width // 2, top + self.state.alien_height)
+                self.pynvaders_game.alien_bullets.fire(midbottom)
+                self.sounds.play_alien_bullet_sound()
+
+            self.state.cooldown[index] = self.clock.time
+
+    def _activate_kamikaze(self, index):
+        """Try to activate the kamikaze attack of a blue alien"""
+        # The chance of the alien activating kamikaze is 50%
+        if self.rng.choice(range(1, 100)) <= 50:
+            self.state.kamikaze[index] = True
+            self.state.kamikaze_indexes.append(index)
+            # The alien leaves its row, so the row could be narrower now
+            self.state.update_row_extents(self.state.row[index])
+            self.sounds.play_alien_kamikaze_sound()
+
+        self.state.cooldown[index] = self.clock.time
+
     def _check_row_edges(self):
-        """Respond appropriately if any aliens in a row have reached an edge"""
-        for row, aliens in self.fleet_rows.items():
-            for alien in aliens:
-                if alien.check_edges():
-                    # For the first 5 levels, the aliens will be polite enough to wait for the rows in "front" of them
-                    # to be destroyed before moving down
-                    if self.stats.level in range(1, 6):
-                        if not row + 1 in self.fleet_rows:
-                            self._drop_and_change_row_direction(row)
-                        else:
-                            self.row_direction[row] *= -1
-                    else:
-                        self._drop_and_change_row_direction(row)
-                    break
+        """Respond appropriately if any aliens in a row have reached an edge
+
+        Only the extents of each row are checked, so the cost depends on the number of rows, not on the number of aliens
+        """
+        state = self.state
+        screen_rect = self.screen.get_rect()
+        # Rects are placed at the rounded position, and rounding keeps the order, so the extreme rects of each row are
+        # the ones of its extreme positions
+        at_edge = ((np.rint(state.row_max_x) + state.alien_width >= screen_rect.right)
+                   | (np.rint(state.row_min_x) <= 0))
+        if not at_edge.any():
+            return
+
+        for row in np.nonzero(at_edge)[0]:
+            # For the first 5 levels, the aliens will be polite enough to wait for the rows in "front" of them to be
+            # destroyed before moving down
+            if self.stats.level in range(1, 6) and row + 1 < len(state.row_count) and state.row_count[row + 1]:
+                state.row_direction[row] *= -1
+            else:
+                self._drop_and_change_row_direction(row)
 
     def _drop_and_change_row_direction(self, row_number):
         """Drop a row of the fleet and change its direction"""
-        for alien in self.fleet_rows[row_number]:
-            alien.y += self.settings.fleet_drop_speed
-            alien.rect.y = alien.y
-        self.row_direction[row_number] *= -1
+        state = self.state
+        row = state.row_slice(row_number)
+        state.y[row][state.alive[row]] += self.settings.fleet_drop_speed
+        state.row_max_y[row_number] += self.settings.fleet_drop_speed
+        state.row_direction[row_number] *= -1
 
     def _check_bottom_screen(self):
         """Check if any aliens have reached the bottom of the screen"""
-        screen_rect = self.screen.get_rect()
-        for row, aliens in self.fleet_rows.items():
-            for alien in aliens:
-                if alien.rect.bottom >= screen_rect.bottom:
-                    # Treat this the same as if the ship got hit
-                    self.pynvaders_game.ship_hit()
+        state = self.state
+        screen_bottom = self.screen.get_rect().bottom
+        # The lowest alien of each row still marching with it, plus every alien in kamikaze mode
+        reached_bottom = (np.rint(state.row_max_y) + state.alien_height >= screen_bottom).any()
+        if not reached_bottom and state.kamikaze_indexes:
+            reached_bottom = (state.top[state.kamikaze_indexes] + state.alien_height >= screen_bottom).any()
 
-                    return
+        if reached_bottom:
+            # Treat this the same as if the ship got hit
+            self.pynvaders_game.ship_hit()
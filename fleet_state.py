@@ -0,0 +1,99 @@
+import numpy as np
+
+# Classes of aliens, in the order of the codes stored in FleetState.alien_class
+ALIEN_CLASSES = ('green', 'blue', 'orange')
+GREEN, BLUE, ORANGE = range(len(ALIEN_CLASSES))
+
+
+class FleetState:
+    """Array-backed store with the state of every alien of the fleet
+
+    Each alien is an index into the arrays, so the whole fleet can be moved and checked with a few vectorized operations
+    instead of walking every alien in Python. Dead aliens keep their slot, with their alive flag turned off
+    """
+
+    def __init__(self, size=0, number_rows=0, alien_width=0, alien_height=0):
+        """Initialize the arrays for a fleet with the given number of aliens and rows"""
+        # All aliens share the same size
+        self.alien_width = alien_width
+        self.alien_height = alien_height
+        # Aliens are laid out row by row, so the aliens of a row are a contiguous run of indexes
+        self.aliens_per_row = size // number_rows if number_rows else 0
+
+        # Exact position of each alien, on the current and the previous simulation tick
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.previous_x = np.zeros(size)
+        self.previous_y = np.zeros(size)
+        # Top left corner, in screen pixels, of the rect of each alien. Refreshed by update_rects()
+        self.left = np.zeros(size)
+        self.top = np.zeros(size)
+
+        self.hp = np.zeros(size, dtype=np.int16)
+        self.alien_class = np.zeros(size, dtype=np.int8)
+        # Index of the image (1 to 3) currently used by each alien
+        self.image_index = np.ones(size, dtype=np.int8)
+        self.row = np.zeros(size, dtype=np.int16)
+        self.alive = np.zeros(size, dtype=bool)
+        self.kamikaze = np.zeros(size, dtype=bool)
+        # Simulation time of the last attempt of each alien to use its ability
+        self.cooldown = np.zeros(size)
+
+        # Direction of each row: 1 represents right; -1 represents left
+        self.row_direction = np.ones(number_rows, dtype=np.int8)
+        # Number of aliens still alive in each row
+        self.row_count = np.zeros(number_rows, dtype=np.int32)
+        # Smallest and largest x, and largest y, of the aliens of each row still marching with it (alive and not in
+        # kamikaze mode). A row without marching aliens has infinite extents, so it never reaches an edge. Refreshed by
+        # update_row_extents(), and moved along with the row by the fleet
+        self.row_min_x = np.full(number_rows, np.inf)
+        self.row_max_x = np.full(number_rows, -np.inf)
+        self.row_max_y = np.full(number_rows, -np.inf)
+        # Indexes of the aliens in kamikaze mode that are still alive. They left their rows, so they are checked apart
+        self.kamikaze_indexes = []
+
+    def __len__(self):
+        """Number of alien slots (alive or not) in the fleet"""
+        return len(self.x)
+
+    def update_rects(self):
+        """Update the rect of each alien from its exact position"""
+        np.rint(self.x, out=self.left)
+        np.rint(self.y, out=self.top)
+
+    def row_slice(self, row):
+        """Return the slice of indexes of the aliens of a row"""
+        return slice(row * self.aliens_per_row, (row + 1) * self.aliens_per_row)
+
+    def update_row_extents(self, rows=slice(None)):
+        """Recompute the extents of a row (or of a slice of rows, all of them by default) from its marching aliens"""
+        if not self.aliens_per_row:
+            return
+
+        if isinstance(rows, (int, np.integer)):
+            rows = slice(rows, rows + 1)
+
+        shape = (-1, self.aliens_per_row)
+        marching = self.alive.reshape(shape)[rows] & ~self.kamikaze.reshape(shape)[rows]
+        x = self.x.reshape(shape)[rows]
+        y = self.y.reshape(shape)[rows]
+        self.row_min_x[rows] = np.where(marching, x, np.inf).min(axis=1)
+        self.row_max_x[rows] = np.where(marching, x, -np.inf).max(axis=1)
+        self.row_max_y[rows] = np.where(marching, y, -np.inf).max(axis=1)
+
+    def alive_count(self):
+        """Number of aliens still alive"""
+        return int(self.row_count.sum())
+
+    def alive_rects(self):
+        """Return the indexes of the alive aliens, and their rects as left, top, right and bottom arrays"""
+        indexes = np.nonzero(self.alive)[0]
+        left = self.left[indexes]
+        top = self.top[indexes]
+        return indexes, (left, top, left + self.alien_width, top + self.alien_height)
+
+    def interpolated_positions(self, alpha):
+        """Return the screen position of each alien, interpolated between the last two simulation ticks"""
+        x = np.rint(self.previous_x + (self.x - self.previous_x) * alpha).astype(np.int32)
+        y = np.rint(self.previous_y + (self.y - self.previous_y) * alpha).astype(np.int32)
+        return x, y
@@ -0,0 +1,77 @@
+import pygame
+
+
+class GameClock:
+    """A fixed-timestep clock that decouples the game simulation from the rendering"""
+
+    def __init__(self, settings):
+        """Initialize the clock and its accumulator"""
+        self.settings = settings
+        self.clock = pygame.time.Clock()
+
+        # Duration, in seconds, of a single simulation tick
+        self.tick_duration = 1 / self.settings.ticks_per_second
+
+        # Time that has passed but hasn't been simulated yet
+        self.accumulator = 0.0
+
+        # Total number of simulation ticks run since the clock was created
+        self.ticks = 0
+
+        # Number of consecutive frames that weren't drawn because the simulation was behind
+        self.skipped_frames = 0
+
+    def begin_frame(self):
+        """Wait for the next frame (according to the render rate cap) and return how many ticks must be simulated"""
+        frame_time = self.clock.tick(self.settings.max_fps) / 1000
+
+        # A very long frame (a window drag, a breakpoint, etc.) would make the simulation run a huge number of ticks to
+        # catch up, making the next frame even longer. We drop the time that goes beyond the maximum ticks per frame
+        max_frame_time = self.tick_duration * self.settings.max_ticks_per_frame
+        self.accumulator += min(frame_time, max_frame_time)
+
+        ticks = int(self.accumulator / self.tick_duration)
+        self.accumulator -= ticks * self.tick_duration
+
+        return ticks
+
+    def advance(self):
+        """Register that a simulation tick has been run"""
+        self.ticks += 1
+
+    @property
+    def time(self):
+        """Simulated time, in seconds, elapsed since the clock was created. The game rules use it instead of the wall
+        clock, so they behave the same no matter how fast the ticks are run"""
+        return self.ticks * self.tick_duration
+
+    @property
+    def alpha(self):
+        """How far, between 0 and 1, we are between the last simulated tick and the next one"""
+        return self.accumulator / self.tick_duration
+
+    def should_render(self, ticks):
+        """Returns True if the frame should be drawn, or False if it can be skipped to let the simulation catch up"""
+        if ticks >= self.settings.max_ticks_per_frame and self.skipped_frames < self.settings.max_frame_skip:
+            self.skipped_frames += 1
+            return False
+
+        self.skipped_frames = 0
+        return True
+
+
+class SimulatedClock(GameClock):
+    """A clock that never waits for the wall clock, used to run the game without a display"""
+
+    def __init__(self, settings, ticks_per_frame=1):
+        """Initialize the clock, and how many ticks are simulated each frame"""
+        super().__init__(settings)
+        self.ticks_per_frame = ticks_per_frame
+
+    def begin_frame(self):
+        """Return the number of ticks to simulate, without waiting"""
+        return self.ticks_per_frame
+
+    def should_render(self, ticks):
+        """A simulated clock never asks for a frame to be drawn"""
+        return False
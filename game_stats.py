@@ -1,3 +1,10 @@
+# States of the game. The game starts inactive (waiting for the player to press Play), is playing until the ship is hit,
+# then respawning for a moment before the next attempt, and goes back to inactive when the player runs out of ships
+INACTIVE = 'inactive'
+PLAYING = 'playing'
+RESPAWNING = 'respawning'
+
+
 class GameStats:
     """Track statistics for Pynvaders"""
 
@@ -6,7 +13,9 @@ class GameStats:
         self.settings = pynvaders_game.settings
         self.reset_stats()
         # Start Pynvaders in an inactive state
-        self.game_active = False
+        self.state = INACTIVE
+        # Simulation time at which a timed state (like respawning) ends
+        self.state_end_time = None
 
         # Current level
         self.level = 1
@@ -17,6 +26,20 @@ class GameStats:
         # Start time of the level. For a grace period, the aliens won't do their special actions
         self.start_time = 0
 
+    @property
+    def game_active(self):
+        """Returns True while a game is being played, including the pauses between attempts"""
+        return self.state != INACTIVE
+
+    def set_state(self, state, end_time=None):
+        """Change the state of the game. A timed state ends at the given simulation time"""
+        self.state = state
+        self.state_end_time = end_time
+
+    def state_ended(self, time):
+        """Returns True if the current state is timed, and its time is up"""
+        return self.state_end_time is not None and time >= self.state_end_time
+
     def reset_stats(self):
         """Initialize statistics that can change during the game"""
         self.ships_left = self.settings.ship_limit
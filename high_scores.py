@@ -0,0 +1,316 @@
+import os
+import queue
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Without file locks (on Windows), a log must not be shared by several processes at once
+    fcntl = None
+
+# First bytes of a high score log, with the version of its format
+LOG_MAGIC = b'PNVHS01\n'
+# Every record of the log is the length and CRC-32 of its payload, followed by the payload: the score, the level, the
+# time it was recorded and the player's name (in UTF-8)
+RECORD_HEADER = struct.Struct('<HI')
+RECORD_FIELDS = struct.Struct('<qHd')
+# Most batches of records (added together) written to the log at once by the background thread
+WRITE_BATCH = 4096
+# Records that have to be missing from the index for it to be saved again on close. Up to this many records are read
+# from the log when opening the store, instead of rewriting the whole index every time
+INDEX_THRESHOLD = 10_000
+
+HighScore = namedtuple('HighScore', ('player', 'score', 'level', 'time'))
+
+
+class HighScoreStore:
+    """Keep the score of every game on disk, and answer top-N and per-player queries over them
+
+    Scores are appended to a log, which is never rewritten: each record has a CRC, and a record torn by a crash (at the
+    end of the log) is cut off when the log is read again. The log is written by a background thread, in batches, so
+    adding a score never waits for the disk. All records are kept in memory as NumPy columns, and saved next to the log
+    as an index once many records are missing from it, so opening the store only reads the records added since.
+
+    Several stores (in different processes) can share a log: every batch is written with the log locked, after reading
+    the records other stores appended since the last one, so the index always covers every record before its end
+    """
+
+    def __init__(self, path, index_path=None):
+        """Open the store at the given path (creating it if needed), and load its records"""
+        self.path = path
+        self.index_path = index_path or path + '.idx'
+
+        # Names of the players, their ids, and the best score of each one (by id)
+        self.players = []
+        self.player_ids = dict()
+        self.player_best = []
+
+        # Columns of the records, and the records added since they were last built (appended on the next query)
+        self.scores = np.zeros(0, dtype=np.int64)
+        self.levels = np.zeros(0, dtype=np.uint16)
+        self.times = np.zeros(0, dtype=np.float64)
+        self.record_players = np.zeros(0, dtype=np.int32)
+        self.pending = []
+        # The records are read by the game and added to by the background thread (with the records of other stores)
+        self.records_lock = threading.Lock()
+
+        # Number of records in the index on disk
+        self.indexed_records = 0
+        log_start = self._load_index()
+
+        # Writes always go to the end of the log. The position is the end of the records this store has read or
+        # written, so records appended by other stores after it are read before writing
+        self.log_file = open(self.path, 'a+b')
+        with self._locked_log():
+            self._open_log(log_start)
+
+        # Records are encoded and written by the background thread
+        self.write_queue = queue.Queue()
+        self.write_error = None
+        self.writer = threading.Thread(target=self._write_records, name='high-score-writer', daemon=True)
+        self.writer.start()
+
+    def __len__(self):
+        """Number of scores in the store"""
+        with self.records_lock:
+            return len(self.scores) + len(self.pending)
+
+    def add(self, player, score, level):
+        """Add the score of a game. It's available to queries right away, and written to the log in the background"""
+        self.add_many([(player, score, level)])
+
+    def add_many(self, games):
+        """Add the scores of many games at once, as (player, score, level) tuples"""
+        recorded_at = time.time()
+        records = [(player, score, level, recorded_at) for player, score, level in games]
+        with self.records_lock:
+            for player, score, level, _ in records:
+                self._add_record(self._player_id(player), score, level, recorded_at)
+        self.write_queue.put(records)
+
+    def best_score(self):
+        """Return the best score of every player, or 0 if there are none"""
+        with self.records_lock:
+            return max(self.player_best, default=0)
+
+    def best_player_score(self, player):
+        """Return the best score of a player, or 0 if they have none"""
+        with self.records_lock:
+            player_id = self.player_ids.get(player)
+            return 0 if player_id is None else self.player_best[player_id]
+
+    def top(self, count=10):
+        """Return the best scores, from the highest. Ties are sorted by the time they were recorded"""
+        with self.records_lock:
+            self._append_pending()
+            return self._best_of(np.arange(len(self.scores)), count)
+
+    def player_top(self, player, count=10):
+        """Return the best scores of a player, from the highest"""
+        with self.records_lock:
+            player_id = self.player_ids.get(player)
+            if player_id is None:
+                return []
+
+            self._append_pending()
+            return self._best_of(np.flatnonzero(self.record_players == player_id), count)
+
+    def flush(self):
+        """Wait until every score added so far is written to the log"""
+        self.write_queue.join()
+
+    def close(self):
+        """Write the pending scores, stop the background thread, and save the index if many records are missing
+        from it"""
+        if self.writer is None:
+            return
+
+        self.write_queue.put(None)
+        self.writer.join()
+        self.writer = None
+
+        if self.write_error is None:
+            with self._locked_log():
+                # Records appended by other stores since the last write belong in the index too
+                self._read_new_records()
+                if len(self) - self.indexed_records >= INDEX_THRESHOLD:
+                    self._save_index()
+
+        self.log_file.close()
+
+    @contextmanager
+    def _locked_log(self):
+        """Hold the lock of the log, so no other store writes to it meanwhile"""
+        if fcntl:
+            fcntl.flock(self.log_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(self.log_file.fileno(), fcntl.LOCK_UN)
+
+    def _player_id(self, player):
+        """Return the id of a player, registering them if they're new. The records lock must be held"""
+        player_id = self.player_ids.get(player)
+        if player_id is None:
+            player_id = self.player_ids[player] = len(self.players)
+            self.players.append(player)
+            self.player_best.append(0)
+
+        return player_id
+
+    def _add_record(self, player_id, score, level, recorded_at):
+        """Add a record to the memory of the store. The records lock must be held"""
+        self.pending.append((score, level, recorded_at, player_id))
+        if score > self.player_best[player_id]:
+            self.player_best[player_id] = score
+
+    def _append_pending(self):
+        """Append the records added since the last query to the columns"""
+        if not self.pending:
+            return
+
+        scores, levels, times, record_players = zip(*self.pending)
+        self.scores = np.concatenate((self.scores, np.array(scores, dtype=np.int64)))
+        self.levels = np.concatenate((self.levels, np.array(levels, dtype=np.uint16)))
+        self.times = np.concatenate((self.times, np.array(times, dtype=np.float64)))
+        self.record_players = np.concatenate((self.record_players, np.array(record_players, dtype=np.int32)))
+        self.pending.clear()
+
+    def _best_of(self, indexes, count):
+        """Return the best scores among the records with the given indexes, from the highest"""
+        if len(indexes) > count:
+            # Only the best records need to be sorted
+            indexes = indexes[np.argpartition(-self.scores[indexes], count - 1)[:count]]
+
+        indexes = indexes[np.lexsort((self.times[indexes], -self.scores[indexes]))]
+        return [HighScore(self.players[self.record_players[index]], int(self.scores[index]), int(self.levels[index]),
+                          float(self.times[index])) for index in indexes]
+
+    def _load_index(self):
+        """Load the records saved in the index, and return the position of the log where the records after them start.
+        An index that's missing, damaged or ahead of the log is ignored, and the whole log is read instead"""
+        try:
+            with np.load(self.index_path) as index:
+                log_end = int(index['log_end'])
+                if log_end > os.path.getsize(self.path):
+                    return 0
+
+                players = [str(player) for player in index['players']]
+                scores = index['scores']
+                levels = index['levels']
+                times = index['times']
+                record_players = index['record_players']
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return 0
+
+        self.players = players
+        self.player_ids = {player: player_id for player_id, player in enumerate(players)}
+        best = np.zeros(len(players), dtype=np.int64)
+        np.maximum.at(best, record_players, scores)
+        self.player_best = best.tolist()
+
+        self.scores, self.levels, self.times, self.record_players = scores, levels, times, record_players
+        self.indexed_records = len(scores)
+        return log_end
+
+    def _open_log(self, start):
+        """Start a new log, or check the existing one and read its records from the given position. The log lock must
+        be held"""
+        self.log_file.seek(0)
+        magic = self.log_file.read(len(LOG_MAGIC))
+        if not magic:
+            self.log_file.write(LOG_MAGIC)
+            self.log_file.flush()
+            os.fsync(self.log_file.fileno())
+        elif magic != LOG_MAGIC:
+            raise ValueError(f"{self.path} is not a high score log")
+
+        self.log_position = max(start, len(LOG_MAGIC))
+        self._read_new_records()
+
+    def _read_new_records(self):
+        """Read the records of the log after the end of the ones in memory. A damaged record means the log was cut by
+        a crash while it was written, so it's truncated there. The log lock must be held"""
+        self.log_file.seek(self.log_position)
+        data = memoryview(self.log_file.read())
+
+        position = 0
+        with self.records_lock:
+            while position < len(data):
+                if position + RECORD_HEADER.size > len(data):
+                    break
+                length, crc = RECORD_HEADER.unpack_from(data, position)
+                payload = data[position + RECORD_HEADER.size:position + RECORD_HEADER.size + length]
+                if len(payload) != length or length < RECORD_FIELDS.size or zlib.crc32(payload) != crc:
+                    break
+
+                score, level, recorded_at = RECORD_FIELDS.unpack_from(payload)
+                player = bytes(payload[RECORD_FIELDS.size:]).decode('utf-8')
+                self._add_record(self._player_id(player), score, level, recorded_at)
+                position += RECORD_HEADER.size + length
+
+            self._append_pending()
+
+        if position < len(data):
+            self.log_file.truncate(self.log_position + position)
+        self.log_position += position
+
+    def _save_index(self):
+        """Save every record as the index, up to the end of the ones in memory. It's written to a temporary file
+        first, so a crash never leaves a partial index in place. The log lock must be held"""
+        with self.records_lock:
+            self._append_pending()
+            temporary_path = self.index_path + '.tmp'
+            with open(temporary_path, 'wb') as index_file:
+                np.savez(index_file, log_end=np.int64(self.log_position),
+                         players=np.array(self.players, dtype=str), scores=self.scores, levels=self.levels,
+                         times=self.times, record_players=self.record_players)
+                index_file.flush()
+                os.fsync(index_file.fileno())
+            os.replace(temporary_path, self.index_path)
+            self.indexed_records = len(self.scores)
+
+    def _write_records(self):
+        """Write the queued records to the log, in batches, until the store is closed"""
+        while True:
+            batch = [self.write_queue.get()]
+            while len(batch) < WRITE_BATCH and batch[-1] is not None:
+                try:
+                    batch.append(self.write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [record for records in batch if records is not None for record in records]
+            if records and self.write_error is None:
+                try:
+                    with self._locked_log():
+                        # Other stores' records go before this batch, so they're read first
+                        self._read_new_records()
+                        self.log_file.write(b''.join(encode_record(*record) for record in records))
+                        self.log_file.flush()
+                        os.fsync(self.log_file.fileno())
+                        self.log_position = self.log_file.tell()
+                except OSError as error:
+                    # The scores stay in memory, but the log can't be trusted anymore, so nothing else is written
+                    self.write_error = error
+
+            for _ in batch:
+                self.write_queue.task_done()
+
+            if batch[-1] is None:
+                return
+
+
+def encode_record(player, score, level, recorded_at):
+    """Return a record of the log, with its header"""
+    payload = RECORD_FIELDS.pack(score, level, recorded_at) + player.encode('utf-8')
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
@@ -0,0 +1,135 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+# Phases of a frame, in the order they run
+PHASES = ('events', 'ship', 'bullets', 'collisions', 'fleet', 'render', 'flip')
+# Things counted on each frame
+COUNTERS = ('sprites', 'bullets_in_flight', 'font_renders', 'sounds_played')
+
+
+class FrameProfiler:
+    """Measure how long each phase of a frame takes, and count what was drawn on it
+
+    The game calls lap() at the end of each phase: the time since the previous lap is added to that phase. Phases that
+    run once per simulation tick (like the fleet update) add up over all the ticks of the frame. The measurements of the
+    last frames are kept in a ring buffer, which can be shown on the screen and saved to a file
+    """
+
+    def __init__(self, pynvaders_game):
+        """Initialize the profiler"""
+        self.pynvaders_game = pynvaders_game
+        self.settings = pynvaders_game.settings
+
+        # One (frame, ticks, phase times..., counters...) record for each of the last frames. Times are in milliseconds
+        self.frames = deque(maxlen=self.settings.profile_frames)
+        self.frame_number = 0
+
+        # Measurements of the current frame
+        self.ticks = 0
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.mark = perf_counter()
+
+        self.overlay = None
+        if self.settings.profile_overlay and not pynvaders_game.headless:
+            self.overlay = ProfilerOverlay(pynvaders_game, self)
+
+    def begin_frame(self, ticks):
+        """Start measuring a frame that will run the given number of simulation ticks"""
+        self.ticks = ticks
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.mark = perf_counter()
+
+    def lap(self, phase):
+        """Add the time since the previous lap to a phase"""
+        now = perf_counter()
+        self.times[phase] += now - self.mark
+        self.mark = now
+
+    def count(self, counter, amount=1):
+        """Add to one of the counters of the frame"""
+        self.counts[counter] += amount
+
+    def end_frame(self):
+        """Store the measurements of the frame"""
+        self.frame_number += 1
+        self.frames.append((self.frame_number, self.ticks) + tuple(self.times[phase] * 1000 for phase in PHASES)
+                           + tuple(self.counts[counter] for counter in COUNTERS))
+
+    def averages(self, frames=60):
+        """Average time of each phase, and average of each counter, over the last frames"""
+        recent = list(self.frames)[-frames:]
+        if not recent:
+            return dict.fromkeys(PHASES + COUNTERS, 0)
+
+        columns = zip(*recent)
+        # Skip the frame number and the ticks
+        next(columns)
+        next(columns)
+        return {name: sum(column) / len(recent) for name, column in zip(PHASES + COUNTERS, columns)}
+
+    def dump(self, path):
+        """Save the measurements to a file, as JSON if its name ends in .json and as CSV otherwise"""
+        header = ('frame', 'ticks') + tuple(f'{phase}_ms' for phase in PHASES) + COUNTERS
+        if path.endswith('.json'):
+            with open(path, 'w') as profile_file:
+                json.dump([dict(zip(header, frame)) for frame in self.frames], profile_file, indent=1)
+        else:
+            with open(path, 'w', newline='') as profile_file:
+                writer = csv.writer(profile_file)
+                writer.writerow(header)
+                writer.writerows(self.frames)
+
+
+class ProfilerOverlay:
+    """Show the averages of the profiler on the screen"""
+
+    def __init__(self, pynvaders_game, profiler):
+        """Initialize the overlay"""
+        self.renderer = pynvaders_game.renderer
+        self.screen_rect = pynvaders_game.screen.get_rect()
+        self.settings = pynvaders_game.settings
+        self.profiler = profiler
+
+        # Font settings for the overlay
+        self.text_color = (30, 30, 30)
+        self.font = pynvaders_game.assets.font(24)
+
+        # Rendering text every frame would show up in the measurements, so the overlay is only refreshed a few times
+        # per second
+        self.refresh_frames = 15
+        self.images = []
+        self.rects = []
+
+    def prep_overlay(self):
+        """Turn the latest averages into rendered images, one per line"""
+        averages = self.profiler.averages()
+        lines = [f"{phase:<10} {averages[phase]:6.2f} ms" for phase in PHASES]
+        lines.append("  ".join(f"{counter} {averages[counter]:.0f}" for counter in COUNTERS))
+        # Whole frame, as measured by the renderer (from the start of drawing to the display update)
+        lines.append(f"{'frame':<10} {self.renderer.average_frame_time() * 1000:6.2f} ms")
+
+        self.images = []
+        self.rects = []
+        bottom = self.screen_rect.bottom - 10
+        for line in reversed(lines):
+            image = self.font.render(line, True, self.text_color, self.settings.bg_color)
+            self.profiler.count('font_renders')
+            rect = image.get_rect()
+            rect.left = 10
+            rect.bottom = bottom
+            bottom = rect.top
+
+            self.images.append(image)
+            self.rects.append(rect)
+
+    def show_overlay(self):
+        """Draw the overlay to the screen"""
+        if self.profiler.frame_number % self.refresh_frames == 0:
+            self.prep_overlay()
+
+        for line_number, (image, rect) in enumerate(zip(self.images, self.rects)):
+            self.renderer.draw_static(('profiler', line_number), image, rect)
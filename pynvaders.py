@@ -1,63 +1,357 @@
+from time import perf_counter
+
+# Start of the launch, measured before the slow imports (pygame, NumPy) for the startup report
+LAUNCH_TIME = perf_counter()
+
 import sys
-import time
-from time import sleep
+import random
+import argparse
 import pygame
 
 from settings import Settings
-from game_stats import GameStats
+from game_stats import GameStats, PLAYING, RESPAWNING, INACTIVE
 from ship import Ship
 import bullets
 from button import Button
 from scoreboard import Scoreboard
 from fleet import Fleet
 from sounds import Sounds
+from collisions import rect_arrays, collides_any
+from renderer import DirtyRenderer
+from assets import AssetManager
+from game_clock import GameClock, SimulatedClock
+from profiler import FrameProfiler
+from controls import InputHandler
+from high_scores import HighScoreStore
+import replay
 
 
 class Pynvaders:
     """Main class for the game"""
 
-    def __init__(self):
-        """Initialize the game and create game resources"""
-        pygame.init()
-        self.settings = Settings()
-
-        self.screen = pygame.display.set_mode((self.settings.screen_width, self.settings.screen_height))
-        pygame.display.set_caption("Pynvaders")
+    def __init__(self, headless=False, clock=None, seed=None, settings=None):
+        """Initialize the game and create game resources
+
+        In headless mode the game runs without a window or sound, on a simulated clock. The clock can be replaced by
+        passing a GameClock instance, and the settings by passing a Settings instance. All the randomness of the game
+        comes from the seed, so two games with the same seed and the same inputs play out exactly the same
+        """
+        self.headless = headless
+        self.settings = Settings() if settings is None else settings
+
+        # Time spent on each step of the startup, until the first frame is shown
+        self.startup_times = []
+        self.startup_mark = LAUNCH_TIME
+        self.startup_report = False
+        self._mark_startup('imports')
+
+        # Random number generator of the game session. Recordings store the seed as an unsigned 64 bit number, so any
+        # other seed is brought into that range
+        self.seed = random.randrange(2 ** 32) if seed is None else seed % 2 ** 64
+        self.rng = random.Random(self.seed)
+
+        # Inputs of the player can be recorded to a file, or replayed from one
+        self.recorder = None
+        self.replay = None
+
+        # The profiler measures each phase of the frames, when enabled
+        self.profiler = None
+
+        if self.headless:
+            # The game rules still need a surface to measure the screen, but nothing will ever be displayed
+            self.screen = pygame.Surface((self.settings.screen_width, self.settings.screen_height))
+        else:
+            # Only the modules the game uses are started. pygame.init() would start every one of them
+            pygame.display.init()
+            pygame.font.init()
+            self.screen = self._set_display_mode()
+            pygame.display.set_caption("Pynvaders")
+        self._mark_startup('display')
+
+        # The game can be played without sound if there is no audio device
+        audio = not self.headless and self._init_mixer()
+        self._mark_startup('mixer')
+
+        # Load the images once, converted to the display's format. Sounds are loaded in the background
+        self.assets = AssetManager(convert=not self.headless)
+        self.assets.preload_images()
+        if audio:
+            self.assets.load_sounds_in_background()
+        self._mark_startup('images')
+
+        # The renderer only redraws the parts of the screen that changed
+        self.renderer = DirtyRenderer(self.screen, self.settings.bg_color)
+
+        # The clock runs the simulation in fixed steps, and caps the frame rate
+        if clock is None:
+            clock = SimulatedClock(self.settings) if self.headless else GameClock(self.settings)
+        self.clock = clock
 
         # Create an instance to store game statistics and create a scoreboard
         self.stats = GameStats(self)
-        self.sb = Scoreboard(self)
+
+        # The scores are kept on disk between sessions. Headless games (simulations, benchmarks) never touch them
+        self.high_scores = None
+        if not self.headless and self.settings.high_scores_path:
+            self.high_scores = HighScoreStore(self.settings.high_scores_path)
+            self.stats.high_score = self.high_scores.best_score()
 
         self.ship = Ship(self)
-        self.player_bullets = pygame.sprite.Group()
-        self.alien_bullets = pygame.sprite.Group()
+        self.sb = Scoreboard(self)
+
+        # Bullets are taken from pools, so firing doesn't create new objects
+        self.player_bullets = bullets.BulletPool(bullets.PlayerBullet, self, self.settings.player_bullets_allowed)
+        self.alien_bullets = bullets.BulletPool(bullets.AlienBullet, self, self.settings.alien_bullets_allowed)
 
         # We load the sound library
-        self.sounds = Sounds()
+        self.sounds = Sounds(self, enabled=audio)
 
         # Create the fleet of aliens
         self.fleet = Fleet(self)
 
         # Make the play button
-        self.play_button = Button(self, "Play")
+        self.play_button = None if self.headless else Button(self, "Play")
+
+        # The player's inputs are read from the window, so a headless game has none
+        self.input_handler = None if self.headless else InputHandler(self)
+        self.latency_report = False
+
+        if self.settings.profiling:
+            self.enable_profiler()
+        self._mark_startup('game objects')
+
+    def _set_display_mode(self):
+        """Open the window, and return the surface the frames are drawn on (always at the logical resolution)"""
+        size = (self.settings.screen_width, self.settings.screen_height)
+        flags = 0
+        if self.settings.scaled:
+            flags |= pygame.SCALED
+        if self.settings.fullscreen:
+            flags |= pygame.FULLSCREEN
+
+        if self.settings.scaled and self.settings.vsync:
+            try:
+                return pygame.display.set_mode(size, flags, vsync=1)
+            except pygame.error:
+                # Not every renderer supports vsync. The frame rate cap still applies without it
+                pass
+
+        try:
+            return pygame.display.set_mode(size, flags)
+        except pygame.error:
+            if not self.settings.scaled:
+                raise
+            # Without a renderer to scale the frames, they are shown as they are
+            return pygame.display.set_mode(size, flags & ~pygame.SCALED)
+
+    def _init_mixer(self):
+        """Start the mixer, and return True if it could be started"""
+        try:
+            pygame.mixer.init(frequency=self.settings.mixer_frequency, size=-16, channels=2,
+                              buffer=self.settings.mixer_buffer)
+            pygame.mixer.set_num_channels(self.settings.mixer_channels)
+        except pygame.error:
+            return False
+        return True
+
+    def _mark_startup(self, step):
+        """Record the time spent on a step of the startup, since the previous step"""
+        now = perf_counter()
+        self.startup_times.append((step, now - self.startup_mark))
+        self.startup_mark = now
+
+    def print_startup_report(self):
+        """Print the time spent on each step of the startup"""
+        for step, seconds in self.startup_times:
+            print(f"{step:<14} {seconds * 1000:8.1f} ms")
+        total = sum(seconds for _, seconds in self.startup_times)
+        print(f"{'total':<14} {total * 1000:8.1f} ms")
 
     def run_game(self):
         """Main loop for the game"""
+        # The first frame ends the startup
+        self._update_screen()
+        self._mark_startup('first frame')
+        if self.startup_report:
+            self.print_startup_report()
+
         while True:
+            ticks = self.clock.begin_frame()
+            if self.profiler:
+                self.profiler.begin_frame(ticks)
+
+            self.sounds.begin_frame()
             self._check_events()
+            if self.profiler:
+                self.profiler.lap('events')
+
+            sample_keys = self.input_handler.sample_keys and not self.replay
+            for _ in range(ticks):
+                if sample_keys:
+                    self.input_handler.sample_movement_keys()
+                self.tick()
+            if ticks:
+                self.input_handler.frame_simulated()
+
+            if self.clock.should_render(ticks):
+                self._update_screen(self.clock.alpha)
+                self.input_handler.frame_presented()
+
+            if self.profiler:
+                self.profiler.end_frame()
+
+    def run_headless(self, max_ticks=None, player=None):
+        """Run a whole game without a display, and return its statistics
+
+        The game ends when the player runs out of ships or after max_ticks. The player, if given, is called with the
+        game instance before every tick, and can drive the ship through its movement flags and fire_bullet()
+        """
+        self.start_game()
+
+        while self.stats.game_active and (max_ticks is None or self.clock.ticks < max_ticks):
+            for _ in range(self.clock.begin_frame()):
+                if player:
+                    player(self)
+                self.tick()
+
+        return self.stats
+
+    def run_replay(self, input_replay):
+        """Replay a recording without a display as fast as possible, and return the game statistics"""
+        self.start_replay(input_replay)
+
+        while not self.replay.finished(self.clock.ticks):
+            for _ in range(self.clock.begin_frame()):
+                self.tick()
+
+        return self.stats
+
+    def start_replay(self, input_replay):
+        """Feed the inputs of a recording to the game, instead of the player's"""
+        if input_replay.ticks_per_second != self.settings.ticks_per_second:
+            raise ValueError(f"The recording was made at {input_replay.ticks_per_second} ticks per second, "
+                             f"but the game runs at {self.settings.ticks_per_second}")
+
+        self.replay = input_replay
+
+    def record_inputs(self, path):
+        """Start recording the inputs of the player to a file"""
+        self.recorder = replay.InputRecorder(path, self.seed, self.settings.ticks_per_second)
+
+    def stop_recording(self):
+        """Stop recording the inputs of the player, if they were being recorded"""
+        if self.recorder:
+            self.recorder.close(self.clock.ticks)
+            self.recorder = None
+
+    def close_high_scores(self):
+        """Save the score of a game quit halfway, and finish writing the scores to disk"""
+        if self.high_scores is not None:
+            if self.stats.game_active and self.stats.score > 0:
+                self._save_score()
+            self.high_scores.close()
+
+    def enable_profiler(self):
+        """Start measuring how long each phase of the frames takes"""
+        self.profiler = FrameProfiler(self)
+
+    def print_latency_report(self):
+        """Print the latency of the player's inputs, from reading them to showing their effect on the screen"""
+        if not (self.latency_report and self.input_handler):
+            return
+
+        report = self.input_handler.latency_report()
+        print(f"Input latency over {report['inputs']} inputs:")
+        for bound, label in (('read', "from reading the input (lower bound)"),
+                             ('queued', "from the previous poll (upper bound)")):
+            statistics = report[bound]
+            print(f"  {label}: mean {statistics['mean']:.1f} ms, p50 {statistics['p50']:.1f} ms, "
+                  f"p99 {statistics['p99']:.1f} ms, max {statistics['max']:.1f} ms")
+
+    def dump_profile(self):
+        """Save the measurements of the profiler, if it's enabled"""
+        if self.profiler:
+            self.profiler.dump(self.settings.profile_path)
+
+    def tick(self):
+        """Advance the game by a single simulation tick, applying the recorded inputs of that tick when replaying. Code
+        that drives the game itself (environments, benchmarks) calls this instead of the frame loops"""
+        self._replay_inputs()
+        self._update_simulation()
+
+    def _replay_inputs(self):
+        """Feed the inputs recorded for the current tick to the game"""
+        if self.replay:
+            for action in self.replay.actions_at(self.clock.ticks):
+                self.handle_input(action)
+
+    def handle_input(self, action):
+        """Respond to an input of the player (one of the inputs defined in the replay module). Returns True if the
+        input had an effect on the game"""
+        if self.recorder:
+            self.recorder.record(self.clock.ticks, action)
+
+        if action == replay.START and not self.stats.game_active:
+            self.start_game()
+        elif action == replay.RIGHT_PRESSED:
+            self.ship.moving_right = True
+        elif action == replay.RIGHT_RELEASED:
+            self.ship.moving_right = False
+        elif action == replay.LEFT_PRESSED:
+            self.ship.moving_left = True
+        elif action == replay.LEFT_RELEASED:
+            self.ship.moving_left = False
+        elif action == replay.FIRE and self.stats.state == PLAYING:
+            return self.fire_bullet()
+        else:
+            return False
+
+        return True
 
-            if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
+    def _update_simulation(self):
+        """Advance the game rules by a single simulation tick"""
+        profiler = self.profiler
+        if profiler:
+            # Inputs sampled or replayed before the tick count as part of the events
+            profiler.lap('events')
+
+        if self.stats.state == RESPAWNING and self.stats.state_ended(self.clock.time):
+            self._respawn()
+
+        if self.stats.state == PLAYING:
+            self.ship.update()
+            if profiler:
+                profiler.lap('ship')
+
+            self._update_bullets()
+
+            # The ship could have been hit by a bullet, which pauses everything
+            if self.stats.state == PLAYING:
                 self.fleet.update_aliens()
 
-            self._update_screen()
+        self.clock.advance()
+        # Respawning creates the next fleet, so a tick that isn't played also ends with the fleet
+        if profiler:
+            profiler.lap('fleet')
 
     def _check_events(self):
         """Respond to key presses and mouse events"""
+        self.input_handler.poll()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 sys.exit()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_q:
+                sys.exit()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F11 and self.settings.scaled:
+                # Switch between the window and full screen. The frames are scaled, so the game itself doesn't change
+                pygame.display.toggle_fullscreen()
+                self.renderer.invalidate()
+            elif event.type == pygame.VIDEOEXPOSE:
+                # The window was covered or restored, so its contents are lost
+                self.renderer.invalidate()
+            elif self.replay:
+                # While replaying a recording, the player's inputs are ignored
+                continue
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
                 self._check_play_button(mouse_pos)
@@ -69,69 +363,75 @@ class Pynvaders:
     def _check_play_button(self, mouse_pos):
         """Start a new game when the player clicks the 'Play' button"""
         if self.play_button.rect.collidepoint(mouse_pos) and not self.stats.game_active:
-            # Reset the game settings
-            self.settings.initialize_dynamic_settings()
+            self.input_handler.send(replay.START)
 
-            # Reset the game statistics
-            self.stats.reset_stats()
-            self.stats.game_active = True
-            self.sb.prep_score()
-            self.sb.prep_ship()
+    def start_game(self):
+        """Start a new game"""
+        # Reset the game settings
+        self.settings.initialize_dynamic_settings()
 
-            self.ship.center_ship()
+        # Reset the game statistics
+        self.stats.reset_stats()
+        self.stats.set_state(PLAYING)
+        self.sb.prep_score()
+        self.sb.prep_ship()
 
-            self._prepare_level()
+        self.ship.center_ship()
 
-            # Hide the mouse cursor
+        self._prepare_level()
+
+        # Hide the mouse cursor
+        if not self.headless:
             pygame.mouse.set_visible(False)
 
     def _check_keydown_events(self, event):
         """Respond to key presses"""
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = True
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = True
-        elif event.key == pygame.K_SPACE and self.stats.game_active:
-            self._fire_bullet()
-        elif event.key == pygame.K_q:
-            sys.exit()
+        # When sampling keys, the movement keys are read from the key state on every tick instead
+        if event.key == pygame.K_RIGHT and not self.input_handler.sample_keys:
+            self.input_handler.send(replay.RIGHT_PRESSED)
+        elif event.key == pygame.K_LEFT and not self.input_handler.sample_keys:
+            self.input_handler.send(replay.LEFT_PRESSED)
+        elif event.key == pygame.K_SPACE and self.stats.state == PLAYING:
+            self.input_handler.send(replay.FIRE)
 
     def _check_keyup_events(self, event):
         """Respond to key releases"""
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = False
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = False
+        if event.key == pygame.K_RIGHT and not self.input_handler.sample_keys:
+            self.input_handler.send(replay.RIGHT_RELEASED)
+        elif event.key == pygame.K_LEFT and not self.input_handler.sample_keys:
+            self.input_handler.send(replay.LEFT_RELEASED)
 
-    def _fire_bullet(self):
-        """Create a new bullet and add it to the bullets group"""
+    def fire_bullet(self):
+        """Fire a new bullet from the ship. Returns True if there was a bullet left to fire"""
         if len(self.player_bullets) < self.settings.player_bullets_allowed:
-            new_player_bullet = bullets.PlayerBullet(self)
-            self.player_bullets.add(new_player_bullet)
+            self.player_bullets.fire(self.ship.rect.midtop)
             self.sounds.play_bullet_sound()
+            return True
+
+        return False
 
     def _update_bullets(self):
         """Update positions of bullets and get rid of old bullets"""
         # Update bullet positions
         self.player_bullets.update()
         self.alien_bullets.update()
+        if self.profiler:
+            self.profiler.lap('bullets')
 
         self._check_bullet_alien_collisions()
         self._check_bullet_ship_collisions()
+        if self.profiler:
+            self.profiler.lap('collisions')
 
     def _check_bullet_alien_collisions(self):
         """Respond to bullet-alien collisions"""
-        for row, aliens in self.fleet.fleet_rows.copy().items():
-            # We remove any bullet that has collided with an alien
-            collisions = pygame.sprite.groupcollide(self.player_bullets, aliens, True, False)
-
-            if collisions:
-                self.fleet.process_bullet_alien_collisions(collisions, aliens, row)
+        # We remove any bullet that has collided with an alien
+        self.fleet.check_bullet_collisions(self.player_bullets)
 
-            self.sb.prep_score()
-            self.sb.check_high_score()
+        self.sb.prep_score()
+        self.sb.check_high_score()
 
-        if not self.fleet.fleet_rows:
+        if self.fleet.is_destroyed():
             # Increase level
             self.stats.level += 1
 
@@ -142,11 +442,18 @@ class Pynvaders:
 
     def _check_bullet_ship_collisions(self):
         """Respond to bullet-ship collisions"""
-        if pygame.sprite.spritecollideany(self.ship, self.alien_bullets):
+        if not self.alien_bullets:
+            return
+
+        if collides_any(self.ship.rect, rect_arrays([bullet.rect for bullet in self.alien_bullets])):
             self.ship_hit()
 
     def ship_hit(self):
         """Respond to the ship being hit by an alien or an alien bullet"""
+        # The ship can only be hit once per attempt
+        if self.stats.state != PLAYING:
+            return
+
         if self.stats.ships_left > 0:
             # Decrement ships_left, and update scoreboard
             self.stats.ships_left -= 1
@@ -154,26 +461,39 @@ class Pynvaders:
 
             self.ship.center_ship()
 
-            # Pause
-            sleep(0.5)
-
-            self._prepare_level()
+            # Pause the game for a moment. The simulation stops, but events are still handled and frames still drawn
+            self.stats.set_state(RESPAWNING, self.clock.time + self.settings.respawn_time)
         else:
-            self.stats.game_active = False
-            pygame.mouse.set_visible(True)
+            self.stats.set_state(INACTIVE)
+            self._save_score()
+            if not self.headless:
+                pygame.mouse.set_visible(True)
+
+    def _save_score(self):
+        """Save the score of the game that just ended. The store writes it in the background, so the frame isn't
+        delayed. Watching a recorded game doesn't count as playing it"""
+        if self.high_scores is not None and not self.replay:
+            self.high_scores.add(self.settings.player_name, self.stats.score, self.stats.level)
 
-    def _update_screen(self):
-        """Update images on the screen, and flip to the new screen"""
-        self.screen.fill(self.settings.bg_color)
-        self.ship.blitme()
-        for bullet in self.player_bullets.sprites():
-            bullet.draw_bullet()
+    def _respawn(self):
+        """Start the next attempt after the ship was hit"""
+        self._prepare_level()
+        self.stats.set_state(PLAYING)
 
-        for bullet in self.alien_bullets.sprites():
-            bullet.draw_bullet()
+    def _update_screen(self, alpha=1.0):
+        """Update images on the screen, and send the parts that changed to the display
 
-        for row, aliens in self.fleet.fleet_rows.items():
-            aliens.draw(self.screen)
+        Moving objects are drawn between their last two simulated positions, using alpha as the blending factor
+        """
+        self.renderer.begin_frame()
+        self.ship.blitme(alpha)
+        for bullet in self.player_bullets:
+            bullet.draw_bullet(alpha)
+
+        for bullet in self.alien_bullets:
+            bullet.draw_bullet(alpha)
+
+        self.fleet.draw_aliens(alpha)
 
         # Draw the score information
         self.sb.show_score()
@@ -182,8 +502,21 @@ class Pynvaders:
         if not self.stats.game_active:
             self.play_button.draw_button()
 
+        profiler = self.profiler
+        if profiler:
+            profiler.count('sprites', len(self.renderer.draws))
+            profiler.count('bullets_in_flight', len(self.player_bullets) + len(self.alien_bullets))
+            if profiler.overlay:
+                profiler.overlay.show_overlay()
+
+        self.renderer.end_frame()
+        if profiler:
+            profiler.lap('render')
+
         # Make the most recently drawn screen visible
-        pygame.display.flip()
+        self.renderer.present()
+        if profiler:
+            profiler.lap('flip')
 
     def _prepare_level(self):
         """Prepare the level's score"""
@@ -195,10 +528,69 @@ class Pynvaders:
         self.fleet.create_fleet()
 
         # Define the start time of the level
-        self.stats.start_time = time.time()
+        self.stats.start_time = self.clock.time
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play Pynvaders")
+    parser.add_argument('--seed', type=int, help="seed for the game's random number generator")
+    parser.add_argument('--record', metavar='FILE', help="record the player's inputs to a file")
+    parser.add_argument('--replay', metavar='FILE', help="replay the inputs recorded in a file")
+    parser.add_argument('--profile', action='store_true',
+                        help="measure each phase of the frames, show the measurements on the screen, and save them "
+                             "on exit")
+    parser.add_argument('--fullscreen', action='store_true', help="play in full screen")
+    parser.add_argument('--vsync', action='store_true', help="synchronize the frames with the display's refresh")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print how long each step of the startup took, up to the first frame")
+    parser.add_argument('--player', metavar='NAME', help="name to save the scores under")
+    parser.add_argument('--sample-keys', action='store_true',
+                        help="read the movement keys from the key state on every simulation tick (the key state "
+                             "only changes once per frame, so a press and release within one frame is missed)")
+    parser.add_argument('--latency-report', action='store_true',
+                        help="print the latency of the inputs, from reading them to showing them on the screen, "
+                             "on exit")
+    parser.add_argument('--headless', action='store_true',
+                        help="replay the recording without a display, as fast as possible, and report the timing")
+    args = parser.parse_args()
+
+    input_replay = replay.InputReplay(args.replay) if args.replay else None
+    seed = input_replay.seed if input_replay else args.seed
+
+    if args.headless:
+        if not input_replay:
+            parser.error("--headless needs a recording to --replay")
+
+        pynvaders = Pynvaders(headless=True, seed=seed)
+        start = perf_counter()
+        stats = pynvaders.run_replay(input_replay)
+        elapsed = perf_counter() - start
+        ticks = pynvaders.clock.ticks
+        print(f"Replayed {ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s)")
+        print(f"Score: {stats.score}, level: {stats.level}, ships left: {stats.ships_left}")
+        sys.exit()
+
     # Make a game instance, and run the game
-    pynvaders = Pynvaders()
-    pynvaders.run_game()
+    settings = Settings()
+    settings.fullscreen = args.fullscreen
+    settings.vsync = args.vsync
+    settings.sample_keys = args.sample_keys
+    if args.player:
+        settings.player_name = args.player
+    pynvaders = Pynvaders(seed=seed, settings=settings)
+    pynvaders.startup_report = args.startup_report
+    pynvaders.latency_report = args.latency_report
+    if args.profile:
+        pynvaders.enable_profiler()
+    if input_replay:
+        pynvaders.start_replay(input_replay)
+    if args.record:
+        pynvaders.record_inputs(args.record)
+
+    try:
+        pynvaders.run_game()
+    finally:
+        pynvaders.stop_recording()
+        pynvaders.dump_profile()
+        pynvaders.print_latency_report()
+        pynvaders.close_high_scores()
@@ -0,0 +1,127 @@
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+
+class DirtyRenderer:
+    """Draw the frames by erasing and redrawing only the parts of the screen that changed
+
+    Moving things (the ship, bullets and aliens) are drawn every frame with blit(), blits() and fill(), and erased on
+    the next one. They are all sent to the screen in a single Surface.blits() call. Things that rarely change (the
+    scoreboard, the play button) are drawn with draw_static(), and only redrawn when they change or when something
+    moving went over them. Only the changed rects are sent to the display
+    """
+
+    def __init__(self, screen, bg_color):
+        """Initialize the renderer"""
+        self.screen = screen
+        self.bg_color = bg_color
+
+        # Moving things to draw on the current frame, as (image, position, area) tuples, ready for Surface.blits()
+        self.draws = []
+        # Surfaces filled with a single color, used to draw filled rects as blits. Stored by (color, size)
+        self.solid_surfaces = dict()
+        # Rects of the moving things drawn on the previous and the current frame
+        self.previous_rects = []
+        self.rects = []
+        # Parts of the screen that changed on the current frame
+        self.dirty_rects = []
+
+        # Static things currently on the screen, and the ones registered for the current frame. Each one is stored by
+        # key as a (source, rect, area) tuple
+        self.statics = dict()
+        self.frame_statics = dict()
+
+        # The whole screen has to be drawn on the first frame
+        self.full_redraw = True
+
+        # Time, in seconds, spent drawing each of the last frames
+        self.frame_times = deque(maxlen=120)
+        self.frame_start = 0.0
+
+    def invalidate(self):
+        """Redraw the whole screen on the next frame (for example, after the window was covered)"""
+        self.full_redraw = True
+
+    def begin_frame(self):
+        """Start a new frame"""
+        self.frame_start = perf_counter()
+        self.draws = []
+        self.frame_statics = dict()
+
+    def blit(self, image, position, area=None):
+        """Draw a moving image (or the given area of it) on the screen"""
+        self.draws.append((image, position, area))
+
+    def blits(self, draws):
+        """Draw many moving images on the screen, given as (image, position, area) tuples"""
+        self.draws.extend(draws)
+
+    def fill(self, color, rect):
+        """Draw a moving rect filled with a color on the screen"""
+        rect = pygame.Rect(rect)
+        key = (color, rect.size)
+        if key not in self.solid_surfaces:
+            solid_surface = pygame.Surface(rect.size)
+            solid_surface.fill(color)
+            self.solid_surfaces[key] = solid_surface
+
+        self.draws.append((self.solid_surfaces[key], rect.topleft, None))
+
+    def draw_static(self, key, source, rect, area=None):
+        """Register a static thing to be shown on this frame. It will only be drawn if it changed"""
+        # We keep a copy of the rect, so changes made to it later are noticed on the next frame
+        self.frame_statics[key] = (source, pygame.Rect(rect), area)
+
+    def end_frame(self):
+        """Draw the frame on the screen surface. present() sends it to the display"""
+        if self.full_redraw:
+            self.screen.fill(self.bg_color)
+            dirty_rects = []
+        else:
+            # Erase the moving things of the previous frame, and the static things that changed or aren't shown anymore
+            dirty_rects = list(self.previous_rects)
+            for key, static in self.statics.items():
+                if self.frame_statics.get(key) != static:
+                    dirty_rects.append(static[1])
+
+            for rect in dirty_rects:
+                self.screen.fill(self.bg_color, rect)
+
+        # Draw the moving things, all in a single batch
+        self.rects = self.screen.blits(self.draws)
+        dirty_rects.extend(self.rects)
+
+        # Draw the static things that are new, changed, or overlap something that was erased or drawn below them
+        for key, static in self.frame_statics.items():
+            source, rect, area = static
+            if self.full_redraw or self.statics.get(key) != static or rect.collidelist(dirty_rects) != -1:
+                dirty_rects.append(self._draw_source(source, rect, area))
+
+        self.dirty_rects = dirty_rects
+        self.statics = self.frame_statics
+        self.previous_rects = self.rects
+
+    def present(self):
+        """Send the changed parts of the screen to the display"""
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.dirty_rects)
+
+        self.frame_times.append(perf_counter() - self.frame_start)
+
+    def average_frame_time(self):
+        """Average time, in seconds, spent drawing each of the last frames"""
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    def _draw_source(self, source, position, area=None):
+        """Draw an image (or an area of it) at the position, or fill the rect with a color. Returns the rect that was
+        drawn"""
+        if isinstance(source, pygame.Surface):
+            return self.screen.blit(source, position, area)
+        return self.screen.fill(source, position)
@@ -0,0 +1,85 @@
+"""Recording and replaying of the player's inputs
+
+A recording is a small binary file: a header with the seed of the game, followed by one record for each input, with the
+simulation tick it happened on. Since the game rules only depend on the seed, the simulation ticks and the inputs,
+replaying a recording reproduces the exact same game
+"""
+import struct
+
+# Inputs of the player
+START = 0
+RIGHT_PRESSED = 1
+RIGHT_RELEASED = 2
+LEFT_PRESSED = 3
+LEFT_RELEASED = 4
+FIRE = 5
+# Marks the last tick of a recording
+END = 255
+
+MAGIC = b'PYNV'
+VERSION = 1
+# Magic, version, seed and simulation ticks per second
+HEADER = struct.Struct('<4sHQH')
+# Simulation tick and input
+RECORD = struct.Struct('<IB')
+
+
+class InputRecorder:
+    """Write the player's inputs to a recording file"""
+
+    def __init__(self, path, seed, ticks_per_second):
+        """Create the recording file, and write its header"""
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, ticks_per_second))
+        # Records are buffered, and written in blocks
+        self.buffer = bytearray()
+
+    def record(self, tick, action):
+        """Record an input of the player on the given tick"""
+        self.buffer += RECORD.pack(tick, action)
+        if len(self.buffer) >= 4096:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records to the file"""
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self, tick):
+        """Mark the end of the recording on the given tick, and close the file"""
+        self.record(tick, END)
+        self.flush()
+        self.file.close()
+
+
+class InputReplay:
+    """The inputs of a recording, ready to be fed back to the game tick by tick"""
+
+    def __init__(self, path):
+        """Read a recording file"""
+        with open(path, 'rb') as replay_file:
+            data = replay_file.read()
+
+        magic, version, self.seed, self.ticks_per_second = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a Pynvaders recording")
+
+        # Inputs of each tick. A recording that wasn't closed properly (or was cut short) ends after its last input
+        self.actions = dict()
+        self.end_tick = 0
+        records = data[HEADER.size:]
+        records = records[:len(records) - len(records) % RECORD.size]
+        for tick, action in RECORD.iter_unpack(records):
+            if action == END:
+                self.end_tick = tick
+                break
+            self.actions.setdefault(tick, []).append(action)
+            self.end_tick = tick + 1
+
+    def actions_at(self, tick):
+        """Return the inputs recorded on the given tick"""
+        return self.actions.get(tick, ())
+
+    def finished(self, tick):
+        """Returns True if the given tick is past the end of the recording"""
+        return tick >= self.end_tick
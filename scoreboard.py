@@ -1,6 +1,4 @@
 import pygame.font
-from pygame.sprite import Group
-from ship import Ship
 
 
 class Scoreboard:
@@ -10,13 +8,33 @@ class Scoreboard:
         """Initialize scorekeeping attributes"""
         self.pynvaders_game = pynvaders_game
         self.screen = pynvaders_game.screen
+        self.renderer = pynvaders_game.renderer
         self.screen_rect = self.screen.get_rect()
         self.settings = pynvaders_game.settings
         self.stats = pynvaders_game.stats
 
+        # A headless game keeps track of the score, but never renders it
+        self.render = not pynvaders_game.headless
+        if not self.render:
+            return
+
         # Font settings for scoring information
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = pynvaders_game.assets.font(48)
+        # Rendered image of each character, so a number can be put together without rendering text again
+        self.glyphs = dict()
+
+        # Values shown by the current images. The images are only rendered again when these change
+        self.shown_score = None
+        self.shown_high_score = None
+        self.shown_level = None
+        self.shown_ships = None
+
+        # The ships left are drawn with the same image as the player's ship
+        self.ship_image = pynvaders_game.ship.image
+        self.ship_texture = pynvaders_game.ship.texture
+        self.ship_texture_area = pynvaders_game.ship.texture_area
+        self.ship_rects = []
 
         # Prepare the initial score images
         self.prep_score()
@@ -26,9 +44,16 @@ class Scoreboard:
 
     def prep_score(self):
         """Turn the score into a rendered image"""
+        if not self.render:
+            return
+
         rounded_score = round(self.stats.score, -1)
+        if rounded_score == self.shown_score:
+            return
+
+        self.shown_score = rounded_score
         score_str = "{:,}".format(rounded_score)
-        self.score_image = self.font.render(score_str, True, self.text_color, self.settings.bg_color)
+        self.score_image = self._render_text(score_str)
 
         # Display the score at the top right of the screen
         self.score_rect = self.score_image.get_rect()
@@ -37,9 +62,16 @@ class Scoreboard:
 
     def prep_high_score(self):
         """Turn the high score into a rendered image"""
+        if not self.render:
+            return
+
         high_score = round(self.stats.high_score, -1)
+        if high_score == self.shown_high_score:
+            return
+
+        self.shown_high_score = high_score
         high_score_str = "{:,}".format(high_score)
-        self.high_score_image = self.font.render(high_score_str, True, self.text_color, self.settings.bg_color)
+        self.high_score_image = self._render_text(high_score_str)
 
         # Center the high score at the tp of the screen
         self.high_score_rect = self.high_score_image.get_rect()
@@ -54,8 +86,15 @@ class Scoreboard:
 
     def prep_level(self):
         """Turn the level into a rendered image"""
+        if not self.render:
+            return
+
+        if self.stats.level == self.shown_level:
+            return
+
+        self.shown_level = self.stats.level
         lvl_str = str(self.stats.level)
-        self.level_image = self.font.render(lvl_str, True, self.text_color, self.settings.bg_color)
+        self.level_image = self._render_text(lvl_str)
 
         # Position the level below the score
         self.level_rect = self.level_image.get_rect()
@@ -64,16 +103,43 @@ class Scoreboard:
 
     def prep_ship(self):
         """Show how many ships are left"""
-        self.ships = Group()
+        if not self.render:
+            return
+
+        if self.stats.ships_left == self.shown_ships:
+            return
+
+        self.shown_ships = self.stats.ships_left
+        self.ship_rects = []
         for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.pynvaders_game)
-            ship.rect.x = 10 + ship_number * ship.rect.width
-            ship.rect.y = 10
-            self.ships.add(ship)
+            ship_rect = self.ship_image.get_rect()
+            ship_rect.x = 10 + ship_number * ship_rect.width
+            ship_rect.y = 10
+            self.ship_rects.append(ship_rect)
+
+    def _render_text(self, text):
+        """Turn text into an image, putting together the cached images of its characters"""
+        glyphs = []
+        for char in text:
+            if char not in self.glyphs:
+                self.glyphs[char] = self.font.render(char, True, self.text_color, self.settings.bg_color)
+                if self.pynvaders_game.profiler:
+                    self.pynvaders_game.profiler.count('font_renders')
+            glyphs.append(self.glyphs[char])
+
+        image = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), self.font.get_height()))
+        image.fill(self.settings.bg_color)
+        x = 0
+        for glyph in glyphs:
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+
+        return image
 
     def show_score(self):
         """Draw scores, level, and ship to the screen"""
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self.ships.draw(self.screen)
+        self.renderer.draw_static('score', self.score_image, self.score_rect)
+        self.renderer.draw_static('high_score', self.high_score_image, self.high_score_rect)
+        self.renderer.draw_static('level', self.level_image, self.level_rect)
+        for ship_number, ship_rect in enumerate(self.ship_rects):
+            self.renderer.draw_static(('ship', ship_number), self.ship_texture, ship_rect, self.ship_texture_area)
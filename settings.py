@@ -3,14 +3,51 @@ class Settings:
 
     def __init__(self):
         """Initialize the game's settings"""
-        # Screen settings
+        # Screen settings. This is the logical resolution of the game: everything is laid out and drawn at this size,
+        # no matter the size of the window or the display
         self.screen_width = 1300
         self.screen_height = 800
         self.bg_color = (230, 230, 230)
 
+        # Display settings. When scaled, the frames are shown through pygame.SCALED: SDL scales them to the window (on
+        # the GPU when it can), and picks a window size that fits the desktop. Vsync is only available when scaled
+        self.scaled = True
+        self.fullscreen = False
+        self.vsync = False
+
+        # Simulation settings. The game rules advance in fixed steps, so all the speeds below are measured in pixels
+        # per simulation tick, no matter how fast the machine can draw the frames
+        self.ticks_per_second = 300
+        # Maximum number of frames drawn per second. A value of 0 leaves the frame rate uncapped
+        self.max_fps = 60
+        # Maximum number of simulation ticks run in a single frame. Time beyond that is dropped, so a slow frame can't
+        # make the next ones even slower
+        self.max_ticks_per_frame = 25
+        # When the simulation is behind, up to this many consecutive frames can be skipped to let it catch up
+        self.max_frame_skip = 5
+
+        # Profiler settings. When profiling, the time spent on each phase of the last frames is kept, shown on the
+        # screen (if the overlay is enabled), and saved on exit (as JSON if the path ends in .json, as CSV otherwise)
+        self.profiling = False
+        self.profile_overlay = True
+        self.profile_frames = 600
+        self.profile_path = 'profile.csv'
+
+        # Input settings. When sampling keys, the movement keys are read from the key state on every simulation tick
+        # instead of from the key events. The latency of the last inputs (time until they show up on the screen) is kept
+        self.sample_keys = False
+        self.latency_samples = 600
+
+        # High score settings. Every game's score is saved under the player's name to the high score log (and an
+        # index of it, next to it with .idx appended). Set the path to None to keep the high score only in memory
+        self.high_scores_path = 'high_scores.log'
+        self.player_name = 'player'
+
         # Ship settings
         self.ship_speed = 1.5
         self.ship_limit = 3
+        # Seconds the game stays paused after the ship is hit, before the next attempt starts
+        self.respawn_time = 0.5
 
         # Player bullet settings
         self.player_bullet_speed = 1.0
@@ -30,6 +67,21 @@ class Settings:
         self.alien_speed = 0.15
         self.fleet_drop_speed = 10
 
+        # Sound settings. The mixer is started with the format of the game's sounds, so they don't need to be
+        # resampled when loaded, and a small buffer to keep the delay between an event and its sound low
+        self.mixer_frequency = 44100
+        self.mixer_buffer = 512
+        self.mixer_channels = 16
+        # Voices (channels playing at once), priority and volume of each category of sound. When every channel is busy,
+        # a sound can only take the channel of a sound with a lower or equal priority
+        self.sound_categories = {
+            'ship_bullet': {'voices': 2, 'priority': 2, 'volume': 0.3},
+            'hit': {'voices': 3, 'priority': 3, 'volume': 1.0},
+            'explosion': {'voices': 4, 'priority': 4, 'volume': 0.5},
+            'alien_bullet': {'voices': 3, 'priority': 1, 'volume': 0.5},
+            'alien_kamikaze': {'voices': 2, 'priority': 5, 'volume': 1.0},
+        }
+
         # How quickly the game speeds up
         self.speedup_scale = 1.05
 
@@ -1,26 +1,29 @@
-import pygame
-from pygame.sprite import Sprite
+from entity import Entity
 
 
-class Ship(Sprite):
+class Ship(Entity):
     """A class to manage the ship"""
+    __slots__ = ('screen_rect', 'image', 'rect', 'texture', 'texture_area', 'x', 'previous_x', 'moving_right',
+                 'moving_left')
 
     def __init__(self, pynvaders_game):
         """Initialize the ship and set its starting position"""
-        super().__init__()
-        self.screen = pynvaders_game.screen
+        super().__init__(pynvaders_game)
         self.screen_rect = pynvaders_game.screen.get_rect()
-        self.settings = pynvaders_game.settings
 
         # Load the ship image and get its rect
-        self.image = pygame.image.load('images/ship.bmp')
+        self.image = pynvaders_game.assets.image('ship')
         self.rect = self.image.get_rect()
+        # The ship is drawn as an area of the sprite atlas
+        self.texture, self.texture_area = pynvaders_game.assets.region('ship')
 
         # Start each new ship at the bottom center of the screen
         self.rect.midbottom = self.screen_rect.midbottom
 
         # Store a decimal value for the ship's horizontal position
         self.x = float(self.rect.x)
+        # Position on the previous simulation tick, used to draw the ship between ticks
+        self.previous_x = self.x
 
         # Movement flag
         self.moving_right = False
@@ -28,20 +31,24 @@ class Ship(Sprite):
 
     def update(self):
         """Update the ship's position based on the movement flag"""
+        self.previous_x = self.x
+
         # Update the ship's x value, not the rect
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.game.settings.ship_speed
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.game.settings.ship_speed
 
         # Update rect object from self.x
         self.rect.x = self.x
 
-    def blitme(self):
-        """Draw the ship at its current location"""
-        self.screen.blit(self.image, self.rect)
+    def blitme(self, alpha=1.0):
+        """Draw the ship at its current location, interpolated between the last two simulation ticks"""
+        x = self.previous_x + (self.x - self.previous_x) * alpha
+        self.game.renderer.blit(self.texture, (round(x), self.rect.y), self.texture_area)
 
     def center_ship(self):
         """Center the ship on the screen"""
         self.rect.midbottom = self.screen_rect.midbottom
         self.x = float(self.rect.x)
+        self.previous_x = self.x
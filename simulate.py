@@ -0,0 +1,210 @@
+"""Play many headless games with a scripted player, and report how far they get
+
+Each game runs in its own process, so the games are spread over all the cores of the machine. Useful to tune the
+difficulty (the speed up of each level, and the chances of each alien class and HP) without playtesting.
+
+Run it from the root of the project: python simulate.py [--games N] [--seed SEED] [--json FILE] [--high-scores FILE]
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+# Games are simulated without a window or sound
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+
+from fleet_state import ALIEN_CLASSES
+from high_scores import HighScoreStore
+import replay
+
+# Ten minutes of game time at 300 ticks per second
+MAX_TICKS = 180_000
+
+
+class HeuristicPlayer:
+    """A simple scripted player: it dodges the alien bullets about to hit the ship, and otherwise moves under the lowest
+    alien and fires at it"""
+
+    def __init__(self, decision_ticks=10, danger_distance=150):
+        """Initialize the player. It decides where to go every few ticks, and fires whenever it can"""
+        self.decision_ticks = decision_ticks
+        self.danger_distance = danger_distance
+
+    def __call__(self, game):
+        """Drive the ship for the next tick"""
+        if game.clock.ticks % self.decision_ticks == 0:
+            self._steer(game, self._target_x(game))
+
+        game.handle_input(replay.FIRE)
+
+    def _target_x(self, game):
+        """Return the x the ship should move to"""
+        ship_rect = game.ship.rect
+
+        # Get out of the way of the closest bullet coming at the ship
+        for bullet in game.alien_bullets:
+            rect = bullet.rect
+            if (ship_rect.top - self.danger_distance <= rect.bottom <= ship_rect.bottom
+                    and ship_rect.left - rect.width <= rect.left <= ship_rect.right):
+                if rect.centerx < ship_rect.centerx:
+                    return ship_rect.centerx + ship_rect.width
+                return ship_rect.centerx - ship_rect.width
+
+        # Chase the lowest alien
+        indexes, (left, top, right, bottom) = game.fleet.state.alive_rects()
+        if not len(indexes):
+            return ship_rect.centerx
+        lowest = np.argmax(bottom)
+        return (left[lowest] + right[lowest]) / 2
+
+    def _steer(self, game, target_x):
+        """Move the ship towards the target"""
+        center_x = game.ship.rect.centerx
+        if target_x > center_x + 2:
+            game.handle_input(replay.LEFT_RELEASED)
+            game.handle_input(replay.RIGHT_PRESSED)
+        elif target_x < center_x - 2:
+            game.handle_input(replay.RIGHT_RELEASED)
+            game.handle_input(replay.LEFT_PRESSED)
+        else:
+            game.handle_input(replay.RIGHT_RELEASED)
+            game.handle_input(replay.LEFT_RELEASED)
+
+
+def play_game(seed, max_ticks=MAX_TICKS):
+    """Play a headless game with the given seed, and return a summary of it"""
+    # Imported here, so the worker processes load pygame only once they start
+    from pynvaders import Pynvaders
+
+    game = Pynvaders(headless=True, seed=seed)
+
+    # Count the aliens of each class and HP of every fleet created, by level
+    alien_mix = dict()
+    create_fleet = game.fleet.create_fleet
+
+    def counted_create_fleet():
+        create_fleet()
+        state = game.fleet.state
+        level_mix = alien_mix.setdefault(game.stats.level, {alien_class: dict() for alien_class in ALIEN_CLASSES})
+        for alien_class, hp in zip(state.alien_class.tolist(), state.hp.tolist()):
+            class_mix = level_mix[ALIEN_CLASSES[alien_class]]
+            class_mix[hp] = class_mix.get(hp, 0) + 1
+
+    game.fleet.create_fleet = counted_create_fleet
+
+    stats = game.run_headless(max_ticks=max_ticks, player=HeuristicPlayer())
+    return {
+        'seed': seed,
+        'score': stats.score,
+        'level': stats.level,
+        'ticks': game.clock.ticks,
+        'survived': stats.game_active,
+        'alien_mix': alien_mix,
+    }
+
+
+def summarize(games):
+    """Aggregate the summaries of the games into a report"""
+    scores = np.array([game['score'] for game in games])
+    levels = np.array([game['level'] for game in games])
+
+    survival = dict()
+    for level in range(1, int(levels.max()) + 1):
+        survival[level] = {
+            # Share of the games that got to the level, and that ended on it
+            'reached': float(np.mean(levels >= level)),
+            'lost': float(np.mean([game['level'] == level and not game['survived'] for game in games])),
+        }
+
+    # Total aliens of each class and HP, by level
+    alien_mix = dict()
+    for game in games:
+        for level, level_mix in game['alien_mix'].items():
+            total_mix = alien_mix.setdefault(level, {alien_class: dict() for alien_class in ALIEN_CLASSES})
+            for alien_class, class_mix in level_mix.items():
+                for hp, count in class_mix.items():
+                    total_mix[alien_class][hp] = total_mix[alien_class].get(hp, 0) + count
+
+    return {
+        'games': len(games),
+        'survived': sum(game['survived'] for game in games),
+        'score': {
+            'mean': float(scores.mean()),
+            'min': int(scores.min()),
+            'p25': float(np.percentile(scores, 25)),
+            'p50': float(np.percentile(scores, 50)),
+            'p75': float(np.percentile(scores, 75)),
+            'p90': float(np.percentile(scores, 90)),
+            'max': int(scores.max()),
+        },
+        'survival_by_level': survival,
+        'alien_mix_by_level': dict(sorted(alien_mix.items())),
+    }
+
+
+def print_report(report):
+    """Print the report as tables"""
+    print(f"{report['games']} games, {report['survived']} still alive when the time ran out\n")
+
+    score = report['score']
+    print("Score: " + ", ".join(f"{name} {value:,.0f}" for name, value in score.items()) + "\n")
+
+    print(f"{'level':>5} {'reached':>8} {'lost':>6}")
+    for level, survival in report['survival_by_level'].items():
+        print(f"{level:>5} {survival['reached']:>8.1%} {survival['lost']:>6.1%}")
+
+    print(f"\n{'level':>5} " + " ".join(f"{alien_class:>11}" for alien_class in ALIEN_CLASSES) + "   (share of aliens, "
+          "and mean HP)")
+    for level, level_mix in report['alien_mix_by_level'].items():
+        totals = {alien_class: sum(class_mix.values()) for alien_class, class_mix in level_mix.items()}
+        aliens = sum(totals.values())
+        columns = []
+        for alien_class in ALIEN_CLASSES:
+            class_mix = level_mix[alien_class]
+            if totals[alien_class]:
+                mean_hp = sum(hp * count for hp, count in class_mix.items()) / totals[alien_class]
+                columns.append(f"{totals[alien_class] / aliens:>5.1%}/{mean_hp:<3.1f}")
+            else:
+                columns.append('-')
+        print(f"{level:>5} " + " ".join(f"{column:>11}" for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless games of Pynvaders, and report the results")
+    parser.add_argument('--games', type=int, default=100, help="number of games to play (100 by default)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game; each game uses the next one")
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS,
+                        help=f"simulation ticks after which a game is stopped ({MAX_TICKS:,} by default)")
+    parser.add_argument('--workers', type=int, help="number of worker processes (one per core by default)")
+    parser.add_argument('--json', metavar='FILE', help="also save the report, and the summary of each game, as JSON")
+    parser.add_argument('--high-scores', metavar='FILE',
+                        help="also add the score of each game to a high score log, under the name 'simulator'")
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + args.games)
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        games = list(executor.map(play_game, seeds, [args.max_ticks] * args.games))
+    elapsed = perf_counter() - start
+
+    report = summarize(games)
+    print_report(report)
+    print(f"\nPlayed {args.games} games in {elapsed:.1f}s")
+
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump(dict(report, games_played=games), report_file, indent=1)
+
+    if args.high_scores:
+        high_scores = HighScoreStore(args.high_scores)
+        high_scores.add_many(('simulator', game['score'], game['level']) for game in games)
+        high_scores.close()
+        print(f"Added {len(games)} scores to {args.high_scores} ({len(high_scores):,} in total)")
+
+
+if __name__ == '__main__':
+    main()
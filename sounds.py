@@ -2,59 +2,150 @@ import pygame
 import random
 
 
+class VoiceManager:
+    # Class to share a pool of mixer channels (voices) between every sound of the game
+    #
+    # Each category of sound can only use a few voices at once. When a category is at its limit, its oldest voice is
+    # restarted with the new sound. When every voice is busy, the new sound takes the voice of the oldest sound with the
+    # lowest priority, if that priority isn't higher than its own, and is dropped otherwise. A sound is played at most
+    # once per frame, so heavy combat costs a bounded amount of audio work per frame
+
+    def __init__(self, pynvaders_game):
+        self.assets = pynvaders_game.assets
+        self.categories = pynvaders_game.settings.sound_categories
+
+        self.channels = [pygame.mixer.Channel(index) for index in range(pygame.mixer.get_num_channels())]
+        # Category of the last sound played on each voice, and when it was started (as a count of the sounds played)
+        self.voice_categories = [None] * len(self.channels)
+        self.voice_starts = [0] * len(self.channels)
+        self.sounds_started = 0
+
+        # Sounds already played on the current frame
+        self.frame_sounds = set()
+
+    def begin_frame(self):
+        # Starts a new frame, so every sound can be played again
+        self.frame_sounds.clear()
+
+    def play(self, category, key):
+        # Plays the sound stored with the given key, as a sound of the category. Returns True if it was played
+        if key in self.frame_sounds:
+            return False
+        self.frame_sounds.add(key)
+
+        voice = self._find_voice(category)
+        if voice is None:
+            return False
+
+        channel = self.channels[voice]
+        channel.set_volume(self.categories[category]['volume'])
+        channel.play(self.assets.sound(key))
+
+        self.sounds_started += 1
+        self.voice_categories[voice] = category
+        self.voice_starts[voice] = self.sounds_started
+        return True
+
+    def _find_voice(self, category):
+        # Returns the voice a sound of the category should be played on, or None if it shouldn't be played
+        limits = self.categories[category]
+        priority = limits['priority']
+
+        free_voice = None
+        category_voices = []
+        lowest_voice = None
+        lowest_key = None
+        for voice, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                if free_voice is None:
+                    free_voice = voice
+                continue
+
+            # Channels playing sounds started outside of the pool (by an earlier game, for example) are left alone
+            voice_category = self.voice_categories[voice]
+            if voice_category is None:
+                continue
+            if voice_category == category:
+                category_voices.append(voice)
+
+            # The oldest of the sounds with the lowest priority is the first one to be replaced
+            key = (self.categories[voice_category]['priority'], self.voice_starts[voice])
+            if lowest_key is None or key < lowest_key:
+                lowest_voice, lowest_key = voice, key
+
+        # A category at its limit restarts its oldest voice
+        if len(category_voices) >= limits['voices']:
+            return min(category_voices, key=lambda voice: self.voice_starts[voice])
+
+        if free_voice is not None:
+            return free_voice
+
+        if lowest_key is not None and lowest_key[0] <= priority:
+            return lowest_voice
+
+        return None
+
+
 class Sounds:
-    # Class to load and play the sounds of the game
-
-    def __init__(self):
-        # Ship (player) bullet sound
-        # We create a channel for the bullet sound so that it doesn't overlap with the hit sound
-        self.ship_bullet_channel = pygame.mixer.Channel(0)
-        self.ship_bullet_channel.set_volume(0.3)
-        self.ship_bullet_sound = pygame.mixer.Sound('sounds/ship_bullet.wav')
-
-        # Hit sound
-        # We create a channel for the hit sound so that it doesn't overlap with the bullet sound, and we set the volume
-        # to 1 so that it's louder than the bullet sound
-        self.hit_channel = pygame.mixer.Channel(1)
-        self.hit_channel.set_volume(1)
-        self.hit_sound = pygame.mixer.Sound('sounds/hit.wav')
-
-        # Explosion sound
-        # We create a channel for the explosion sound so that it doesn't overlap with the other sounds
-        self.explosion_channel = pygame.mixer.Channel(2)
-        self.explosion_channel.set_volume(0.5)
-        self.explosion_sound1 = pygame.mixer.Sound('sounds/explosions/explosion_1.wav')
-        self.explosion_sound2 = pygame.mixer.Sound('sounds/explosions/explosion_2.wav')
-
-        # Alien bullet sound
-        self.alien_bullet_channel = pygame.mixer.Channel(3)
-        self.alien_bullet_channel.set_volume(0.5)
-        self.alien_bullet_sound = pygame.mixer.Sound('sounds/alien_bullet.wav')
-
-        # Alien kamikaze sound
-        self.alien_kamikaze_channel = pygame.mixer.Channel(4)
-        self.alien_kamikaze_channel.set_volume(1)
-        self.alien_kamikaze_sound = pygame.mixer.Sound('sounds/alien_kamikaze.wav')
+    # Class to play the sounds of the game. The sounds themselves are loaded by the asset manager
+
+    def __init__(self, pynvaders_game, enabled=True):
+        # When the sounds are disabled (like in a headless game) the mixer is never touched, and nothing is played
+        self.enabled = enabled
+        if not self.enabled:
+            return
+
+        self.pynvaders_game = pynvaders_game
+        # The sounds have their own random number generator, so playing them or not doesn't change the game
+        self.rng = random.Random(pynvaders_game.seed)
+
+        # Every sound is played on a voice of the shared pool of channels
+        self.voices = VoiceManager(pynvaders_game)
+
+    def begin_frame(self):
+        # Starts a new frame of the game
+        if not self.enabled:
+            return
+
+        self.voices.begin_frame()
+
+    def _play(self, category, key):
+        # Plays a sound on the voice pool, and counts it for the profiler
+        if self.voices.play(category, key) and self.pynvaders_game.profiler:
+            self.pynvaders_game.profiler.count('sounds_played')
 
     def play_bullet_sound(self):
         # Plays the bullet sound
-        self.ship_bullet_channel.play(self.ship_bullet_sound)
+        if not self.enabled:
+            return
+
+        self._play('ship_bullet', 'ship_bullet')
 
     def play_hit_sound(self):
         # Plays the hit sound
-        self.hit_channel.play(self.hit_sound)
+        if not self.enabled:
+            return
+
+        self._play('hit', 'hit')
 
     def play_explosion_sound(self):
         # Plays a random explosion sound
+        if not self.enabled:
+            return
+
         # We randomly choose one of the two explosion sounds
-        explosion_sound = random.choice([self.explosion_sound1, self.explosion_sound2])
-        # We play the explosion sound
-        self.explosion_channel.play(explosion_sound)
+        self._play('explosion', self.rng.choice(['explosion_1', 'explosion_2']))
 
     def play_alien_bullet_sound(self):
         # Plays the alien bullet sound
-        self.alien_bullet_channel.play(self.alien_bullet_sound)
+        if not self.enabled:
+            return
+
+        self._play('alien_bullet', 'alien_bullet')
 
     def play_alien_kamikaze_sound(self):
         # Plays the alien kamikaze sound
-        self.alien_kamikaze_channel.play(self.alien_kamikaze_sound)
+        if not self.enabled:
+            return
+
+        self._play('alien_kamikaze', 'alien_kamikaze')
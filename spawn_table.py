@@ -0,0 +1,61 @@
+from itertools import accumulate
+
+import numpy as np
+
+from fleet_state import ALIEN_CLASSES, GREEN, BLUE, ORANGE
+
+# Chances of an alien having the first, second or third HP value of its class, from the fifth level onwards
+HP_WEIGHTS = (0.85, 0.10, 0.05)
+
+
+class SpawnTable:
+    """The chances of each alien class and HP on a level, compiled once so a whole fleet can be drawn in one batch
+
+    Draws use the same random numbers, in the same order, as picking each alien with random.choices(), so a seeded game
+    spawns the same fleets it always did
+    """
+
+    def __init__(self, level, alien_classes_hp):
+        """Compile the cumulative weights of the classes and HP values of the level"""
+        # For the first 2 levels, only the green aliens will be present
+        if level < 3:
+            classes = [GREEN]
+            weights = [1]
+        elif level < 6:
+            # For levels 3-5, there will be a 15% chance of the blue aliens being present
+            classes = [GREEN, BLUE]
+            weights = [0.85, 0.15]
+        else:
+            # From level 6 and forward, the probability of each alien class being chosen increases as the player
+            # progresses through the levels
+            classes = [GREEN, BLUE, ORANGE]
+            weights = [(level - 5) * 0.01, (level - 5) * 0.001, (level - 5) * 0.0009]
+
+        self.classes = np.array(classes, dtype=np.int8)
+        self.class_weights = np.array(list(accumulate(weights)))
+
+        # From the fourth level and forward, there will be a small probability for the chosen alien class to have more
+        # HP. Before that, every alien has the first HP value of its class
+        self.draw_hp = level > 4
+        self.hp_weights = np.array(list(accumulate(HP_WEIGHTS)))
+
+        # HP values of each class, by class code. The image of an alien is the position of its HP value, plus one
+        self.hp_values = np.array([alien_classes_hp[alien_class] for alien_class in ALIEN_CLASSES], dtype=np.int16)
+
+    def draw(self, rng, count):
+        """Draw the class, HP and image index of a fleet of the given number of aliens, using the random generator"""
+        draws_per_alien = 2 if self.draw_hp else 1
+        randoms = np.array([rng.random() for _ in range(count * draws_per_alien)]).reshape(count, draws_per_alien)
+
+        alien_class = self.classes[self._pick(self.class_weights, randoms[:, 0])]
+        if self.draw_hp:
+            hp_option = self._pick(self.hp_weights, randoms[:, 1])
+        else:
+            hp_option = np.zeros(count, dtype=np.intp)
+
+        return alien_class, self.hp_values[alien_class, hp_option], (hp_option + 1).astype(np.int8)
+
+    def _pick(self, cumulative_weights, randoms):
+        """Pick an option for each random number between 0 and 1, the way random.choices() does"""
+        options = np.searchsorted(cumulative_weights, randoms * cumulative_weights[-1], side='right')
+        return np.minimum(options, len(cumulative_weights) - 1)